@@ -1,17 +1,19 @@
-import csv
-import time
-from fifteenpuzzle import FifteenPuzzleState, FifteenPuzzleSearchProblem, createRandomFifteenPuzzle
-from search import aStarSearch, H1, H2, H3, H4
+from fifteenpuzzle import createRandomFifteenPuzzle
+from search import H1, H2, H3, H4, H5, H6, H7
 from statistics import mean
 from tabulate import tabulate
-from multiprocessing import Process, Queue
+from batch import read_scenarios, solve_scenarios
+import solutioncache
 #start of task 3 
 # Define a dictionary to map heuristics to their functions
 heuristics = {
     'h1': H1,
     'h2': H2,
     'h3': H3,
-    'h4': H4
+    'h4': H4,
+    'h5': H5,
+    'h6': H6,
+    'h7': H7
 }
 
 # Generate random puzzles and save them in a file
@@ -29,35 +31,9 @@ def generate_random_puzzles(filename, num_puzzles=20):
 # Read puzzle configurations from a file
 def read_puzzle_configurations(filename):
     """
-    Read puzzle configurations from a file.
+    Read puzzle configurations from a file (text or packed .bin, see batch.read_scenarios).
     """
-    configurations = []
-    with open(filename, 'r') as file:
-        for line in file:
-            config = [int(n) for n in line.strip().split()]
-            configurations.append(config)
-    return configurations
-
-# Run the A* search with the specified heuristic and log the results in the result_queue
-def run_search_algorithm(problem, heuristic_function, result_queue):
-    """
-    Function to run the search algorithm and put the result in the queue.
-    """
-    start_time = time.time()
-    try:
-        result = aStarSearch(problem, heuristic_function)
-        
-        # Return result as expected
-        path = result['Solution']
-        nodes_expanded = result['Expanded Nodes']
-        max_fringe_size = result['Max Fringe Size']
-        depth = result['Depth']
-        execution_time = time.time() - start_time
-        
-        result_queue.put((path, nodes_expanded, max_fringe_size, depth, execution_time))
-    except Exception as e:
-        print(f"Error: {e}")
-        result_queue.put((None, "Timeout", "Timeout", "Timeout", "Timeout"))
+    return read_scenarios(filename)
 
 def main():
     # Step 1: Generate random puzzles and save them to a CSV file
@@ -71,47 +47,19 @@ def main():
     results = {heuristic: {'Nodes Expanded': [], 'Max Fringe Size': [], 'Depth': [], 'Execution Time': []} for heuristic in heuristics.keys()}
     timeout = 120 # Timeout value in seconds for each configuration
 
-    # Step 4: Open the results CSV file and write headers
-    with open('results.csv', 'w', newline='') as results_file:
-        results_writer = csv.writer(results_file)
-        results_writer.writerow(['Initial State', 'Heuristic', 'Expanded Nodes', 'Max Fringe Size', 'Depth', 'Execution Time'])
-
-        # Step 5: Iterate over each puzzle configuration
-        for config in configurations:
-            puzzle = FifteenPuzzleState(config)  # Create a FifteenPuzzleState object for each configuration
-            problem = FifteenPuzzleSearchProblem(puzzle)  # Create a search problem for the configuration
-
-            # Step 6: Run the search algorithm for each heuristic
-            for heuristic_name, heuristic_function in heuristics.items():
-                result_queue = Queue()
-                process = Process(target=run_search_algorithm, args=(problem, heuristic_function, result_queue))
-                process.start()
-
-                # Wait for the process to finish or timeout
-                process.join(timeout)
-
-                if process.is_alive():
-                    print(f"Timeout occurred for configuration {config} with heuristic {heuristic_name}")
-                    process.terminate()
-                    process.join()
-                    results_writer.writerow([' '.join(map(str, config)), heuristic_name, "Timeout", "Timeout", "Timeout", "Timeout"])
-                else:
-                    try:
-                        path, nodes_expanded, max_fringe_size, depth, execution_time = result_queue.get()
-                    except Exception as e:
-                        print(f"Error retrieving results from queue: {e}")
-                        path, nodes_expanded, max_fringe_size, depth, execution_time = None, "Error", "Error", "Error", "Error"
-
-                    if path is None:
-                        nodes_expanded = max_fringe_size = depth = execution_time = "Timeout"
+    # Step 4: Solve every configuration with every heuristic on a pool of worker
+    # processes; rows are written to the results CSV file as they finish and
+    # boards solved by an earlier run come from the solution cache
+    rows = solve_scenarios(configurations, 'results.csv', heuristics, timeout,
+                           cache_filename=solutioncache.DEFAULT_FILENAME)
 
-                    if nodes_expanded != "Timeout":
-                        results[heuristic_name]['Nodes Expanded'].append(nodes_expanded)
-                        results[heuristic_name]['Max Fringe Size'].append(max_fringe_size)
-                        results[heuristic_name]['Depth'].append(depth)
-                        results[heuristic_name]['Execution Time'].append(execution_time)
-                    
-                    results_writer.writerow([' '.join(map(str, config)), heuristic_name, nodes_expanded, max_fringe_size, depth, execution_time])
+    # Step 5: Collect the metrics of the solved runs (timed out runs have "Timeout" as their depth)
+    for config, heuristic_name, nodes_expanded, max_fringe_size, depth, execution_time in rows:
+        if depth != "Timeout":
+            results[heuristic_name]['Nodes Expanded'].append(nodes_expanded)
+            results[heuristic_name]['Max Fringe Size'].append(max_fringe_size)
+            results[heuristic_name]['Depth'].append(depth)
+            results[heuristic_name]['Execution Time'].append(execution_time)
 
     # Calculate averages for each heuristic
     averages = {
@@ -131,7 +79,7 @@ def main():
     print("\nAverage Results:")
     print(tabulate(rows, headers=headers, tablefmt="grid"))
 
-if _name_ == "_main_":
+if __name__ == "__main__":
     main()
 
 
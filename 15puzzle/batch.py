@@ -0,0 +1,153 @@
+"""
+In batch.py, we solve whole scenario files on a persistent pool of worker
+processes. Every (configuration, heuristic) pair is one job; workers are
+started once and reused, so heuristic tables are loaded once per worker, and
+each row is appended to the results file as soon as its job finishes.
+Boards already solved in an earlier run are read from the solution cache
+(see solutioncache.py) instead of being searched again.
+
+Usage: python batch.py [scenarios.csv|.bin] [results.csv] [timeout] [processes]
+                       [--max-nodes N] [--max-expansions N] [--weight W] [--anytime]
+                       [--workers N]
+"""
+
+import argparse
+import csv
+import multiprocessing
+import time
+import binaryformat
+import parallelsearch
+import solutioncache
+import util
+from fifteenpuzzle import PackedFifteenPuzzleState, FifteenPuzzleSearchProblem, unpackBoard
+from search import aStarSearch, anytimeAStarSearch, smaStarSearch, H1, H2, H3, H4, H5, H6, H7
+
+HEADER = ['Initial State', 'Heuristic', 'Expanded Nodes', 'Max Fringe Size', 'Depth', 'Execution Time']
+
+heuristics = {
+    'h1': H1,
+    'h2': H2,
+    'h3': H3,
+    'h4': H4,
+    'h5': H5,
+    'h6': H6,
+    'h7': H7
+}
+
+def read_scenarios(filename):
+    """
+    Read puzzle configurations, one per line, separated by commas (as written
+    by generator.py) or whitespace (as written by automate.py). A .bin file is
+    read as a packed scenario file (see binaryformat.py).
+    """
+    if filename.endswith('.bin'):
+        return [unpackBoard(board) for board in binaryformat.read_boards(filename)]
+    configurations = []
+    with open(filename, 'r') as file:
+        for line in file:
+            line = line.replace(',', ' ').strip()
+            if line:
+                configurations.append([int(n) for n in line.split()])
+    return configurations
+
+# Each worker opens the solution cache once and keeps it for all its jobs
+_caches = {}
+
+def _open_cache(filename):
+    if filename not in _caches:
+        _caches[filename] = solutioncache.SolutionCache(filename)
+    return _caches[filename]
+
+def solve_job(job):
+    """
+    Run one search inside a worker. The search itself stops at the job's
+    timeout (and max_expansions, if set; see util.SearchLimits), so the
+    worker goes straight on to the next job. A search that gave up still
+    reports its expanded nodes, max fringe size and time, with "Timeout" as
+    its depth. Cached solutions report the time of the search that found
+    them.
+
+    The options pick the search: A* (weighted if weight > 1), the
+    memory-bounded smaStarSearch with max_nodes, with anytime the
+    anytimeAStarSearch, which keeps its best solution at the timeout, or
+    with workers the parallel parallelsearch.hdaStarSearch. Only optimal A*
+    uses the cache.
+    """
+    config, heuristic_name, heuristic_function, options = job
+    problem = FifteenPuzzleSearchProblem(PackedFifteenPuzzleState(config))
+    limits = util.SearchLimits(options['timeout'], options['max_expansions'])
+    if options['anytime']:
+        result = anytimeAStarSearch(problem, heuristic_function, max(options['weight'], 1), limits=limits)
+    elif options['workers']:
+        result = parallelsearch.hdaStarSearch(problem, heuristic_function, options['workers'], limits)
+    elif options['max_nodes']:
+        result = smaStarSearch(problem, heuristic_function, options['max_nodes'], limits)
+    else:
+        cache = _open_cache(options['cache_filename']) if options['cache_filename'] else None
+        result = aStarSearch(problem, heuristic_function, cache, options['weight'], limits)
+    depth = result['Depth'] if result['Solved'] else "Timeout"
+    return (config, heuristic_name, result['Expanded Nodes'], result['Max Fringe Size'], depth, result['Time'])
+
+def solve_scenarios(configurations, results_filename='results.csv', heuristic_functions=None,
+                    timeout=120, processes=None, cache_filename=None, max_nodes=None,
+                    weight=1, anytime=False, max_expansions=None, workers=None):
+    """
+    Solve every configuration with every heuristic and stream one CSV row per
+    job to results_filename in completion order. Returns the rows.
+    processes defaults to the number of CPUs. With cache_filename, the
+    workers share that solution cache. max_nodes caps the nodes each search
+    keeps in memory (see search.smaStarSearch) and max_expansions the nodes
+    it may expand before giving up. weight > 1 trades optimality
+    for speed with weighted A*; with anytime, it is the starting weight of
+    search.anytimeAStarSearch (3 if not given), which improves its solution
+    until the timeout. With workers, each job is one HDA* search on that many
+    processes and the jobs run one after another instead of on the pool.
+    """
+    if heuristic_functions is None:
+        heuristic_functions = heuristics
+    if anytime and weight == 1:
+        weight = 3.0
+    options = {'timeout': timeout, 'cache_filename': cache_filename, 'max_nodes': max_nodes,
+               'max_expansions': max_expansions, 'weight': weight, 'anytime': anytime, 'workers': workers}
+    jobs = [(config, name, function, options)
+            for config in configurations
+            for name, function in heuristic_functions.items()]
+    # Build any cached heuristic tables here so the workers don't all race to build them
+    goal = PackedFifteenPuzzleState([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0])
+    for function in heuristic_functions.values():
+        function(goal, None)
+    rows = []
+    with open(results_filename, 'w', newline='') as results_file:
+        results_writer = csv.writer(results_file)
+        results_writer.writerow(HEADER)
+        # HDA* starts its own processes, which pool workers are not allowed to do
+        pool = multiprocessing.Pool(processes) if not workers else None
+        try:
+            for row in pool.imap_unordered(solve_job, jobs) if pool else map(solve_job, jobs):
+                config = row[0]
+                results_writer.writerow([' '.join(map(str, config))] + list(row[1:]))
+                results_file.flush()  # Keep finished rows on disk if the run is interrupted
+                rows.append(row)
+        finally:
+            if pool:
+                pool.terminate()
+    return rows
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Solve a scenario file with every heuristic.")
+    parser.add_argument('scenarios', nargs='?', default='scenarios.csv')
+    parser.add_argument('results', nargs='?', default='results.csv')
+    parser.add_argument('timeout', nargs='?', type=int, default=120)
+    parser.add_argument('processes', nargs='?', type=int, default=None)
+    parser.add_argument('--max-nodes', type=int, default=None, help="memory-bounded search with this node budget")
+    parser.add_argument('--max-expansions', type=int, default=None, help="give up after expanding this many nodes")
+    parser.add_argument('--weight', type=float, default=1, help="weighted A* with f = g + weight * h")
+    parser.add_argument('--workers', type=int, default=None, help="solve each job with parallel HDA* on this many processes")
+    parser.add_argument('--anytime', action='store_true', help="anytime A* that improves its solution until the timeout")
+    args = parser.parse_args()
+    start_time = time.time()
+    rows = solve_scenarios(read_scenarios(args.scenarios), args.results,
+                           timeout=args.timeout, processes=args.processes,
+                           cache_filename=solutioncache.DEFAULT_FILENAME, max_nodes=args.max_nodes,
+                           weight=args.weight, anytime=args.anytime, max_expansions=args.max_expansions, workers=args.workers)
+    print(f"Solved {len(rows)} jobs in {time.time() - start_time:.1f}s, results in {args.results}")
@@ -0,0 +1,332 @@
+"""
+In benchmark.py, we time the searches on fixed instance sets so that runs
+can be compared with each other over time.
+
+Instance sets are CSV files with an 'Optimal Depth' and an 'Initial State'
+column. make_instance_set draws boards from a seeded random number
+generator and keeps those whose optimal depth lies in a bucket such as
+20-29; the sets in benchmarks/ were made with
+
+    python benchmark.py instances --seed 15 --count 10
+
+and are committed, so every run uses exactly the same boards; the 50-59
+set covers the depths of typical random boards. Korf's 100 random
+instances (Korf, 1985) belong to the default sets too but are not shipped:
+no copy that could be checked against the paper was at hand, and a
+mistyped board would quietly change the workload. Convert a copy of the
+list with
+
+    python benchmark.py korf100 korf100.txt
+
+which rotates the boards to this project's goal (see read_korf100) and
+writes them to benchmarks/korf100.csv in the same format as the other
+sets, then save the baseline again. Until then, `run` without instance
+set files stops with an error instead of benchmarking less than intended.
+
+run_benchmark runs every algorithm in a fresh worker process, first solving
+a few boards to warm up (loading pattern databases and the like), then every
+board `repeats` times. summarize reports, per algorithm and instance set, how
+many boards were solved and the 10th, 50th and 90th percentiles of time,
+expanded nodes and max fringe size, and the worker's peak RSS.
+compare_to_baseline checks a summary against a saved one (a JSON file) and
+lists the regressions. Times and memory depend on the machine, so save a
+baseline on the machine that runs the checks; node counts and solution
+depths do not.
+
+Usage: python benchmark.py instances [--seed S] [--count N] [--buckets 10-19,20-29]
+       python benchmark.py korf100 korf100.txt [--output benchmarks/korf100.csv]
+       python benchmark.py run [sets...] [--algorithms astar/H6 idastar/H5]
+                           [--warmup N] [--repeats N] [--timeout S] [--time-tolerance F]
+                           [--baseline benchmarks/baseline.json] [--save-baseline]
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import random
+import sys
+import generator
+import instrumentation
+import search
+import util
+from fifteenpuzzle import PackedFifteenPuzzleState, FifteenPuzzleSearchProblem
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+KORF100_SET = os.path.join(BENCHMARK_DIR, 'korf100.csv')
+DEFAULT_BUCKETS = ((10, 19), (20, 29), (30, 39), (40, 49), (50, 59))
+DEFAULT_ALGORITHMS = ('astar/H5', 'astar/H6', 'astar/H7', 'idastar/H5', 'biastar/H6')
+PERCENTILES = (10, 50, 90)
+METRICS = ('Time', 'Expanded Nodes', 'Max Fringe Size')
+
+# A metric regresses when its median grows by more than this fraction.
+# Node counts are deterministic, so any growth counts; time easily varies by
+# a third between runs on a shared machine.
+TOLERANCES = {'Time': 0.5, 'Expanded Nodes': 0.0, 'Max Fringe Size': 0.0, 'Peak RSS': 0.10}
+# Growth below this many seconds is timer noise on the easiest boards
+TIME_RESOLUTION = 0.005
+
+def instance_set_filename(min_depth, max_depth, directory=BENCHMARK_DIR):
+    return os.path.join(directory, 'depth_%02d-%02d.csv' % (min_depth, max_depth))
+
+def optimal_depth(numbers):
+    """Optimal solution length of a board, with IDA* and the pattern database heuristic."""
+    problem = FifteenPuzzleSearchProblem(PackedFifteenPuzzleState(numbers))
+    return search.idaStarSearch(problem, search.H5, util.TranspositionTable())['Depth']
+
+def make_instance_set(seed, min_depth, max_depth, count):
+    """
+    count (depth, board) pairs with optimal depth in [min_depth, max_depth],
+    the same for the same arguments.
+    """
+    rng = random.Random('%d/%d-%d' % (seed, min_depth, max_depth))
+    return [(optimal_depth(numbers), numbers)
+            for numbers in generator.sample_boards(count, rng, min_depth=min_depth, max_depth=max_depth)]
+
+def write_instance_set(instances, filename):
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Optimal Depth', 'Initial State'])
+        for depth, numbers in instances:
+            writer.writerow([depth, ' '.join(map(str, numbers))])
+
+def read_instance_set(filename):
+    """List of (optimal depth, board) pairs; the depth is None if the file has none."""
+    with open(filename, 'r', newline='') as f:
+        reader = csv.reader(f)
+        next(reader)  # Header
+        return [(int(depth) if depth else None, [int(n) for n in state.split()]) for depth, state in reader]
+
+def read_korf100(filename):
+    """
+    Read Korf's 100 random instances. Each line holds 16 tiles in the
+    original layout, whose goal has the blank in the top left (0 1 2 ... 15),
+    or an instance number, the 16 tiles and optionally the optimal depth.
+    Turning a board half a turn and renaming tile t to 16 - t maps that goal
+    to this project's and keeps every solution length.
+    """
+    instances = []
+    with open(filename, 'r') as f:
+        for line in f:
+            numbers = [int(n) for n in line.replace(',', ' ').split()]
+            if not numbers:
+                continue
+            tiles = numbers if len(numbers) == 16 else numbers[1:17]
+            depth = numbers[17] if len(numbers) > 17 else None
+            instances.append((depth, [16 - tile if tile else 0 for tile in reversed(tiles)]))
+    return instances
+
+def percentile(values, p):
+    """p-th percentile of values with linear interpolation, None if empty."""
+    if not values:
+        return None
+    values = sorted(values)
+    position = (len(values) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+def parse_algorithm(spec):
+    """'astar/H6' -> (search.astar, search.H6); a spec without a heuristic gets None."""
+    name, _, heuristic_name = spec.partition('/')
+    function = getattr(search, name)
+    return function, getattr(search, heuristic_name) if heuristic_name else None
+
+def _run_algorithm(job):
+    # Runs in its own worker process, so its peak RSS is this algorithm's alone
+    spec, sets, warmup, repeats, timeout = job
+    function, heuristic = parse_algorithm(spec)
+    args = (heuristic,) if heuristic is not None else ()
+
+    def run(numbers):
+        problem = FifteenPuzzleSearchProblem(PackedFifteenPuzzleState(numbers))
+        return function(problem, *args, limits=util.SearchLimits(timeout))
+
+    warmup_boards = [numbers for _, instances in sets for _, numbers in instances][:warmup]
+    for numbers in warmup_boards:
+        run(numbers)
+    runs = []
+    for set_name, instances in sets:
+        for index, (optimal, numbers) in enumerate(instances):
+            for repeat in range(repeats):
+                result = run(numbers)
+                solved = result['Solved']
+                runs.append({
+                    'Algorithm': spec,
+                    'Set': set_name,
+                    'Instance': index,
+                    'Repeat': repeat,
+                    'Solved': solved,
+                    'Optimal Depth': optimal,
+                    'Depth': result['Depth'] if solved else None,
+                    'Time': result['Time'] if solved else timeout,
+                    'Expanded Nodes': result['Expanded Nodes'] if solved else None,
+                    'Max Fringe Size': result['Max Fringe Size'] if solved else None
+                })
+    return spec, runs, instrumentation.peakRSS()
+
+def run_benchmark(sets, algorithms=DEFAULT_ALGORITHMS, warmup=2, repeats=3, timeout=60):
+    """
+    Run every algorithm spec on the instance sets, a list of (name, instances)
+    pairs. Returns (runs, peak RSS per algorithm); a run that timed out counts
+    as unsolved and takes the timeout as its time.
+    """
+    jobs = [(spec, sets, warmup, repeats, timeout) for spec in algorithms]
+    runs = []
+    peaks = {}
+    # One fresh process per algorithm; spawn so none inherits another's memory
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for spec, algorithm_runs, peak in pool.imap(_run_algorithm, jobs):
+            runs.extend(algorithm_runs)
+            peaks[spec] = peak
+    return runs, peaks
+
+def summarize(runs, peaks):
+    """{'algorithm|set': statistics} for every algorithm and instance set in runs."""
+    groups = {}
+    for run in runs:
+        groups.setdefault('%s|%s' % (run['Algorithm'], run['Set']), []).append(run)
+    summary = {}
+    for key, group in groups.items():
+        solved = [run for run in group if run['Solved']]
+        stats = {
+            'Runs': len(group),
+            'Solved': len(solved),
+            'Wrong Depths': sum(1 for run in solved
+                                if run['Optimal Depth'] is not None and run['Depth'] != run['Optimal Depth']),
+            'Peak RSS': peaks.get(group[0]['Algorithm'])
+        }
+        for metric in METRICS:
+            values = [run[metric] for run in (group if metric == 'Time' else solved)]
+            for p in PERCENTILES:
+                stats['%s p%d' % (metric, p)] = percentile(values, p)
+        summary[key] = stats
+    return summary
+
+def compare_to_baseline(summary, baseline, tolerances=TOLERANCES):
+    """
+    Regressions of summary against baseline, as messages: fewer boards
+    solved, more suboptimal solutions, or a median (or the peak RSS) grown by
+    more than its tolerance (and, for time, by more than TIME_RESOLUTION).
+    Keys missing from either side are ignored.
+    """
+    regressions = []
+    for key, stats in sorted(summary.items()):
+        old = baseline.get(key)
+        if old is None:
+            continue
+        # Counts are compared as fractions of the runs, which depend on --repeats
+        if stats['Solved'] * old['Runs'] < old['Solved'] * stats['Runs']:
+            regressions.append("%s: solved %d of %d, was %d of %d" % (
+                key, stats['Solved'], stats['Runs'], old['Solved'], old['Runs']))
+        if stats['Wrong Depths'] * old['Runs'] > old['Wrong Depths'] * stats['Runs']:
+            regressions.append("%s: %d of %d solutions suboptimal, was %d of %d" % (
+                key, stats['Wrong Depths'], stats['Runs'], old['Wrong Depths'], old['Runs']))
+        for metric, tolerance in tolerances.items():
+            field = metric if metric == 'Peak RSS' else metric + ' p50'
+            if stats.get(field) is None or not old.get(field):
+                continue
+            slack = TIME_RESOLUTION if metric == 'Time' else 0
+            if stats[field] > old[field] * (1 + tolerance) + slack:
+                regressions.append("%s: %s %.4g, was %.4g (+%.0f%%)" % (
+                    key, field, stats[field], old[field], 100 * (stats[field] / old[field] - 1)))
+    return regressions
+
+def print_summary(summary):
+    print("%-34s %7s %10s %10s %10s %12s %12s %10s" % (
+        'Algorithm | Set', 'Solved', 'Time p10', 'Time p50', 'Time p90', 'Expanded p50', 'Fringe p50', 'Peak MiB'))
+    for key, stats in sorted(summary.items()):
+        def show(value, form):
+            return form % value if value is not None else '-'
+        print("%-34s %3d/%-3d %10s %10s %10s %12s %12s %10s" % (
+            key, stats['Solved'], stats['Runs'],
+            show(stats['Time p10'], '%.4f'), show(stats['Time p50'], '%.4f'), show(stats['Time p90'], '%.4f'),
+            show(stats['Expanded Nodes p50'], '%d'), show(stats['Max Fringe Size p50'], '%d'),
+            show(stats['Peak RSS'] and stats['Peak RSS'] / 2 ** 20, '%.1f')))
+
+def default_sets():
+    """The depth sets and Korf's 100 instances; raises FileNotFoundError if any is missing."""
+    filenames = [instance_set_filename(low, high) for low, high in DEFAULT_BUCKETS] + [KORF100_SET]
+    missing = [filename for filename in filenames if not os.path.exists(filename)]
+    if missing:
+        raise FileNotFoundError("missing instance sets %s; convert Korf's instances with "
+                                "'python benchmark.py korf100 FILE', or name the sets to run" % ', '.join(missing))
+    return filenames
+
+def parse_buckets(text):
+    return [tuple(int(n) for n in bucket.split('-')) for bucket in text.split(',')]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the searches on fixed instance sets.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    instances_parser = commands.add_parser('instances', help="generate the depth-bucketed instance sets")
+    instances_parser.add_argument('--seed', type=int, default=15)
+    instances_parser.add_argument('--count', type=int, default=10, help="boards per bucket")
+    instances_parser.add_argument('--buckets', type=parse_buckets, default=DEFAULT_BUCKETS, help="e.g. 10-19,20-29")
+    instances_parser.add_argument('--directory', default=BENCHMARK_DIR)
+    korf_parser = commands.add_parser('korf100', help="convert Korf's 100 instances to an instance set")
+    korf_parser.add_argument('korf100', help="the instances in their original layout (see read_korf100)")
+    korf_parser.add_argument('--output', default=KORF100_SET)
+    run_parser = commands.add_parser('run', help="run the benchmark")
+    run_parser.add_argument('sets', nargs='*', help="instance set files (default: the sets in benchmarks/)")
+    run_parser.add_argument('--korf100', help="also run Korf's 100 instances from this file, in their original layout")
+    run_parser.add_argument('--algorithms', nargs='+', default=DEFAULT_ALGORITHMS,
+                            help="search[/heuristic] names from search.py, e.g. astar/H6")
+    run_parser.add_argument('--warmup', type=int, default=2)
+    run_parser.add_argument('--repeats', type=int, default=3)
+    run_parser.add_argument('--timeout', type=int, default=60)
+    run_parser.add_argument('--runs', help="write every run to this CSV file")
+    run_parser.add_argument('--time-tolerance', type=float, default=TOLERANCES['Time'],
+                            help="flag median times more than this fraction above the baseline")
+    run_parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    run_parser.add_argument('--save-baseline', action='store_true', help="store this summary as the baseline")
+    args = parser.parse_args()
+
+    if args.command == 'instances':
+        os.makedirs(args.directory, exist_ok=True)
+        for low, high in args.buckets:
+            filename = instance_set_filename(low, high, args.directory)
+            write_instance_set(make_instance_set(args.seed, low, high, args.count), filename)
+            print(f"{args.count} boards of depth {low}-{high} saved to {filename}")
+        sys.exit(0)
+    if args.command == 'korf100':
+        instances = read_korf100(args.korf100)
+        write_instance_set(instances, args.output)
+        print(f"{len(instances)} boards saved to {args.output}")
+        sys.exit(0)
+
+    try:
+        filenames = args.sets or default_sets()
+    except FileNotFoundError as error:
+        parser.error(str(error))
+    sets = [(os.path.splitext(os.path.basename(filename))[0], read_instance_set(filename))
+            for filename in filenames]
+    if args.korf100:
+        sets.append(('korf100', read_korf100(args.korf100)))
+    runs, peaks = run_benchmark(sets, args.algorithms, args.warmup, args.repeats, args.timeout)
+    if args.runs:
+        with open(args.runs, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(runs[0]))
+            writer.writeheader()
+            writer.writerows(runs)
+    summary = summarize(runs, peaks)
+    print_summary(summary)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(summary, f, indent=1, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        missing = sorted(set(summary) - set(baseline))
+        if missing:
+            print("Not in the baseline, save it again to compare: " + ', '.join(missing))
+        regressions = compare_to_baseline(summary, baseline, dict(TOLERANCES, Time=args.time_tolerance))
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
@@ -0,0 +1,193 @@
+"""
+In binaryformat.py, we read and write the packed binary versions of the
+scenario and result files, and convert them to and from the CSV files.
+
+Scenario files (.bin) have no header: each board is one little-endian
+unsigned 64-bit int in the layout of fifteenpuzzle.packBoard (cell
+row * 4 + col in bits 4 * (row * 4 + col)), so the file is 8 bytes per board.
+
+Result files are columnar. A header
+
+    magic b'15PR', version (uint32), row count (uint64),
+    length of the heuristic names (uint32), the names ('\\n'-separated UTF-8)
+
+is followed by one contiguous column per field, each starting on an 8-byte
+boundary, in the order of RESULT_COLUMNS. Unsolved runs have status 1, depth
+0 and the counts and time the search reached before it gave up (zeros if
+the CSV row had none).
+
+Both readers memory-map the file and return memoryviews over it, so opening
+a file with millions of rows costs no parsing and no per-row objects.
+"""
+
+import csv
+import mmap
+import struct
+import sys
+from array import array
+from fifteenpuzzle import packBoard, unpackBoard
+
+RESULTS_MAGIC = b'15PR'
+RESULTS_VERSION = 1
+RESULTS_HEADER = struct.Struct('<4sIQI')
+
+# (name, array typecode) of every results column, in file order
+RESULT_COLUMNS = (
+    ('board', 'Q'),
+    ('heuristic', 'B'),   # Index into the file's heuristic names
+    ('status', 'B'),      # 0 solved, 1 timeout or error
+    ('expanded_nodes', 'Q'),
+    ('max_fringe_size', 'Q'),
+    ('depth', 'H'),
+    ('execution_time', 'd'),
+)
+
+def _padding(size):
+    return -size % 8
+
+def _map(filename):
+    with open(filename, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _view(buffer, typecode):
+    # The files are little-endian; on other hosts fall back to a byteswapped copy
+    if sys.byteorder == 'little':
+        return memoryview(buffer).cast(typecode)
+    values = array(typecode, bytes(buffer))
+    values.byteswap()
+    return memoryview(values)
+
+def _write_array(f, values):
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    values.tofile(f)
+
+def write_boards(boards, filename):
+    """
+    Stream packed boards (ints) to a scenario file in chunks. Returns the
+    number of boards written.
+    """
+    written = 0
+    with open(filename, 'wb') as f:
+        chunk = array('Q')
+        for board in boards:
+            chunk.append(board)
+            if len(chunk) == 4096:
+                _write_array(f, chunk)
+                written += len(chunk)
+                chunk = array('Q')
+        _write_array(f, chunk)
+        written += len(chunk)
+    return written
+
+def read_boards(filename):
+    """Memory-map a scenario file; returns a sequence of packed boards."""
+    with open(filename, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            return memoryview(array('Q'))  # mmap refuses empty files
+    return _view(_map(filename), 'Q')
+
+def write_results(rows, filename, heuristic_names):
+    """
+    Write result rows to a columnar results file. rows are dicts with the
+    keys of RESULT_COLUMNS, except 'heuristic' is a name from
+    heuristic_names.
+    """
+    index = {name: i for i, name in enumerate(heuristic_names)}
+    columns = {name: array(typecode) for name, typecode in RESULT_COLUMNS}
+    for row in rows:
+        for name, _ in RESULT_COLUMNS:
+            columns[name].append(index[row[name]] if name == 'heuristic' else row[name])
+    names = '\n'.join(heuristic_names).encode('utf-8')
+    with open(filename, 'wb') as f:
+        f.write(RESULTS_HEADER.pack(RESULTS_MAGIC, RESULTS_VERSION, len(columns['board']), len(names)))
+        f.write(names)
+        f.write(b'\0' * _padding(RESULTS_HEADER.size + len(names)))
+        for name, _ in RESULT_COLUMNS:
+            _write_array(f, columns[name])
+            f.write(b'\0' * _padding(len(columns[name]) * columns[name].itemsize))
+
+def read_results(filename):
+    """
+    Memory-map a results file. Returns (heuristic_names, columns) where
+    columns maps every name in RESULT_COLUMNS to a memoryview of its values.
+    """
+    data = _map(filename)
+    magic, version, count, names_size = RESULTS_HEADER.unpack_from(data, 0)
+    if magic != RESULTS_MAGIC or version != RESULTS_VERSION:
+        raise Exception("Not a results file: %s" % filename)
+    offset = RESULTS_HEADER.size
+    names = bytes(data[offset:offset + names_size]).decode('utf-8')
+    heuristic_names = names.split('\n') if names else []
+    offset += names_size + _padding(offset + names_size)
+    columns = {}
+    for name, typecode in RESULT_COLUMNS:
+        size = count * array(typecode).itemsize
+        columns[name] = _view(memoryview(data)[offset:offset + size], typecode)
+        offset += size + _padding(size)
+    return heuristic_names, columns
+
+def scenarios_csv_to_binary(csv_filename, binary_filename):
+    """Convert a scenario CSV (comma- or space-separated boards) to a scenario file."""
+    def boards():
+        with open(csv_filename, 'r') as f:
+            for line in f:
+                line = line.replace(',', ' ').strip()
+                if line:
+                    yield packBoard([int(n) for n in line.split()])
+    return write_boards(boards(), binary_filename)
+
+def scenarios_binary_to_csv(binary_filename, csv_filename):
+    """Convert a scenario file back to comma-separated rows."""
+    boards = read_boards(binary_filename)
+    with open(csv_filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        for board in boards:
+            writer.writerow(unpackBoard(board))
+    return len(boards)
+
+def results_csv_to_binary(csv_filename, binary_filename):
+    """Convert a results CSV as written by automate.py/batch.py to a results file."""
+    rows = []
+    heuristic_names = []
+    with open(csv_filename, 'r', newline='') as f:
+        reader = csv.reader(f)
+        next(reader)  # Header
+        for state, heuristic, expanded, fringe, depth, execution_time in reader:
+            if heuristic not in heuristic_names:
+                heuristic_names.append(heuristic)
+            row = {'board': packBoard([int(n) for n in state.split()]), 'heuristic': heuristic,
+                   'status': 0 if depth.isdigit() else 1, 'depth': int(depth) if depth.isdigit() else 0}
+            # Older files have "Timeout" in every column of a timed out run
+            row['expanded_nodes'] = int(expanded) if expanded.isdigit() else 0
+            row['max_fringe_size'] = int(fringe) if fringe.isdigit() else 0
+            try:
+                row['execution_time'] = float(execution_time)
+            except ValueError:
+                row['execution_time'] = 0.0
+            rows.append(row)
+    write_results(rows, binary_filename, heuristic_names)
+    return len(rows)
+
+def results_binary_to_csv(binary_filename, csv_filename):
+    """Convert a results file back to the CSV layout of automate.py/batch.py."""
+    heuristic_names, columns = read_results(binary_filename)
+    with open(csv_filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Initial State', 'Heuristic', 'Expanded Nodes', 'Max Fringe Size', 'Depth', 'Execution Time'])
+        for i in range(len(columns['board'])):
+            row = [' '.join(map(str, unpackBoard(columns['board'][i]))), heuristic_names[columns['heuristic'][i]]]
+            row += [columns['expanded_nodes'][i], columns['max_fringe_size'][i],
+                    "Timeout" if columns['status'][i] else columns['depth'][i], columns['execution_time'][i]]
+            writer.writerow(row)
+    return len(columns['board'])
+
+if __name__ == '__main__':
+    # python binaryformat.py scenarios|results input output; the .bin side picks the direction
+    kind, source, target = sys.argv[1:4]
+    if kind == 'scenarios':
+        convert = scenarios_binary_to_csv if source.endswith('.bin') else scenarios_csv_to_binary
+    else:
+        convert = results_binary_to_csv if source.endswith('.bin') else results_csv_to_binary
+    print(f"Converted {convert(source, target)} rows from {source} to {target}")
@@ -1,50 +1,49 @@
-import time
 import csv
-from fifteenpuzzle import FifteenPuzzleSearchProblem, createRandomFifteenPuzzle  # Import your problem and puzzle creation
-from search import aStarSearch, breadthFirstSearch, depthFirstSearch, uniformCostSearch  # Import your search algorithms
-#start of task 4 
-# Define the number of test cases
-num_tests = 250
-results = []
+import util
+from fifteenpuzzle import PackedFifteenPuzzleState, FifteenPuzzleSearchProblem  # Import your problem and puzzle creation
+from search import aStarSearch, breadthFirstSearch, depthFirstSearch, uniformCostSearch, H3  # Import your search algorithms
+from benchmark import instance_set_filename, read_instance_set
+#start of task 4
+# The uninformed searches only finish on shallow boards, so compare on the
+# fixed set of boards 10-19 moves from the goal (see benchmark.py); every run
+# sees the same boards and can be compared with earlier ones.
+INSTANCE_SET = instance_set_filename(10, 19)
+TIMEOUT = 60
 
 # Define search strategies
 strategies = {
-    'A* (H3)': aStarSearch,
-    'BFS': breadthFirstSearch,
-    'DFS': depthFirstSearch,
+    'A* (H3)': lambda problem, limits: aStarSearch(problem, H3, limits=limits),
+    'BFS': lambda problem, limits: breadthFirstSearch(problem, limits=limits),
+    'DFS': lambda problem, limits: depthFirstSearch(problem, limits=limits),
     'UCS': uniformCostSearch
 }
 
-# Run tests
-for i in range(num_tests):
-    puzzle = createRandomFifteenPuzzle()  # Create a random 15-puzzle
-    problem = FifteenPuzzleSearchProblem(puzzle)  # Set up the search problem
+def main():
+    results = []
+    # Run tests
+    for _, numbers in read_instance_set(INSTANCE_SET):
+        puzzle = PackedFifteenPuzzleState(numbers)
+        for strategy_name, strategy in strategies.items():
+            problem = FifteenPuzzleSearchProblem(puzzle)  # Set up the search problem
+            result = strategy(problem, util.SearchLimits(TIMEOUT))  # Execute the search strategy
 
-    for strategy_name, strategy in strategies.items():
-        start_time = time.time()
-        result = strategy(problem)  # Execute the search strategy
-
-        if result['Solved']:
-            execution_time = time.time() - start_time
-            results.append([
-                puzzle, strategy_name, result['Expanded Nodes'], 
-                result['Max Fringe Size'], result['Depth'], 
-                execution_time
-            ])
-        else:
+            # A search that timed out still reports how far it got
             results.append([
-                puzzle, strategy_name, "Timeout", "Timeout", "Timeout", "Timeout"
+                ' '.join(map(str, numbers)), strategy_name, result['Expanded Nodes'],
+                result['Max Fringe Size'], result['Depth'] if result['Solved'] else "Timeout",
+                result['Time']
             ])
 
-# Write results to a CSV file
-with open('comparison_results.csv', 'w', newline='') as f:
-    writer = csv.writer(f)
-    writer.writerow(['Initial State', 'Strategy', 'Expanded Nodes', 'Max Fringe Size', 'Depth', 'Execution Time'])
-    writer.writerows(results)
-
-# Print results summary (optional)
-for row in results:
-    print(row)
+    # Write results to a CSV file
+    with open('comparison_results.csv', 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Initial State', 'Strategy', 'Expanded Nodes', 'Max Fringe Size', 'Depth', 'Execution Time'])
+        writer.writerows(results)
 
+    # Print results summary (optional)
+    for row in results:
+        print(row)
 
-#end of task 4 
\ No newline at end of file
+if __name__ == '__main__':
+    main()
+#end of task 4
@@ -1,9 +1,55 @@
 import random
 import search
 
+# Moves as small ints. Cells are numbered row * 4 + col and a move names the
+# direction the blank travels.
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+MOVE_NAMES = ('up', 'down', 'left', 'right')
+MOVE_CODES = {name: code for code, name in enumerate(MOVE_NAMES)}
+MOVE_OFFSETS = (-4, 4, -1, 1)  # Change of the blank's cell index, by move code
+INVERSE_CODES = (DOWN, UP, RIGHT, LEFT)
+INVERSE_MOVES = {name: MOVE_NAMES[INVERSE_CODES[code]] for code, name in enumerate(MOVE_NAMES)}
+
+# For each blank cell, its legal moves as (move code, cell the blank moves to)
+MOVE_TABLE = tuple(
+    tuple((code, cell + MOVE_OFFSETS[code]) for code, legal in
+          ((UP, cell >= 4), (DOWN, cell < 12), (LEFT, cell % 4 != 0), (RIGHT, cell % 4 != 3)) if legal)
+    for cell in range(16)
+)
+LEGAL_MOVES = tuple(tuple(MOVE_NAMES[code] for code, _ in moves) for moves in MOVE_TABLE)
+
+def moveCode(move):
+    """Move code of a move given by name ('up', ...) or already as a code."""
+    code = MOVE_CODES.get(move, move)
+    if code not in (UP, DOWN, LEFT, RIGHT):
+        raise Exception("Illegal move")
+    return code
+
 # start of task 1 
+def asciiString(cells):
+    """Render a 4x4 grid of tiles as the ASCII board used by every state class."""
+    lines = []
+    horizontalLine = ('-' * (5 * 4 + 1))  # Line for 4x4 grid
+    lines.append(horizontalLine)
+    for row in cells:
+        rowLine = '|'
+        for col in row:
+            if col == 0:
+                col = ' '  # Represent the blank tile
+            rowLine += ' {:2} |'.format(col)  # Format for alignment
+        lines.append(rowLine)
+        lines.append(horizontalLine)
+    return '\n'.join(lines)
+
 class FifteenPuzzleState:
+    # key packs the board into one int (see packBoard) and is computed once,
+    # together with its hash, so equality, hashing and the goal test never
+    # walk the grid. cells must therefore not be modified in place.
+    __slots__ = ('cells', 'blankLocation', 'key', 'hashValue', 'h')
+
     def __init__(self, numbers):
+        self.key = packBoard(numbers)
+        self.hashValue = hash(self.key)
         self.cells = []
         numbers = numbers[:]  # Avoid side effects by copying
         numbers.reverse()  # Reverse the list to populate the grid correctly
@@ -16,108 +62,228 @@ class FifteenPuzzleState:
 
 
     def __getAsciiString(self):
-        lines = []
-        horizontalLine = ('-' * (5 * 4 + 1))  # Line for 4x4 grid
-        lines.append(horizontalLine)
-        for row in self.cells:
-            rowLine = '|'
-            for col in row:
-                if col == 0:
-                    col = ' '  # Represent the blank tile
-                rowLine += ' {:2} |'.format(col)  # Format for alignment
-            lines.append(rowLine)
-            lines.append(horizontalLine)
-        return '\n'.join(lines)
+        return asciiString(self.cells)
 
     def __str__(self):
         return self.__getAsciiString()
 
     def __eq__(self, other):
-        return self.cells == other.cells
+        return isinstance(other, FifteenPuzzleState) and self.key == other.key
 
     def __hash__(self):
-        return hash(tuple(tuple(row) for row in self.cells))
+        return self.hashValue
 
     def __lt__(self, other):
-        return str(self) < str(other)
+        return self.cells < other.cells
+
+    def tiles(self):
+        """The 16 tiles in row-major order (0 = blank)."""
+        return [tile for row in self.cells for tile in row]
 
 
  # end of taks 1 
 
 
     def isGoal(self):
-        current = 1
-        for row in range(4):
-            for col in range(4):
-                if row == 3 and col == 3:
-                    return self.cells[row][col] == 0  # Blank tile at bottom-right
-                if self.cells[row][col] != current:
-                    return False
-                current += 1
-        return True
+        return self.key == GOAL_BOARD
 
     def legalMoves(self):
-        moves = []
         row, col = self.blankLocation
-        if row != 0:
-            moves.append('up')
-        if row != 3:
-            moves.append('down')
-        if col != 0:
-            moves.append('left')
-        if col != 3:
-            moves.append('right')
-        return moves
+        return list(LEGAL_MOVES[row * 4 + col])
 
     def result(self, move):
         row, col = self.blankLocation
-        if move == 'up':
-            newrow = row - 1
-            newcol = col
-        elif move == 'down':
-            newrow = row + 1
-            newcol = col
-        elif move == 'left':
-            newrow = row
-            newcol = col - 1
-        elif move == 'right':
-            newrow = row
-            newcol = col + 1
-        else:
-            raise Exception("Illegal move")
+        newrow, newcol = divmod(row * 4 + col + MOVE_OFFSETS[moveCode(move)], 4)
 
-        newPuzzle = FifteenPuzzleState([0] * 16)
+        tile = self.cells[newrow][newcol]
+        newPuzzle = FifteenPuzzleState.__new__(FifteenPuzzleState)
         newPuzzle.cells = [values[:] for values in self.cells]
-        newPuzzle.cells[row][col] = self.cells[newrow][newcol]
+        newPuzzle.cells[row][col] = tile
         newPuzzle.cells[newrow][newcol] = 0
         newPuzzle.blankLocation = newrow, newcol
+        # Same xor update as PackedFifteenPuzzleState.result
+        newPuzzle.key = self.key ^ (tile << (4 * (newrow * 4 + newcol))) ^ (tile << (4 * (row * 4 + col)))
+        newPuzzle.hashValue = hash(newPuzzle.key)
 
         return newPuzzle
 
+    def expand(self, previousMove=None):
+        """
+        Children as (state, move code) pairs from MOVE_TABLE, leaving out the
+        move that undoes previousMove (a move code) if one is given.
+        """
+        skip = INVERSE_CODES[previousMove] if previousMove is not None else None
+        row, col = self.blankLocation
+        return [(self.result(code), code) for code, _ in MOVE_TABLE[row * 4 + col] if code != skip]
+
+def packBoard(numbers):
+    """Pack 16 tile numbers (row-major, 0 = blank) into one int, 4 bits per cell."""
+    board = 0
+    for index, tile in enumerate(numbers):
+        board |= tile << (4 * index)
+    return board
+
+# The two tiles packed in each byte of a board, lower cell first
+BYTE_TILES = tuple((byte & 0xF, byte >> 4) for byte in range(256))
+
+def unpackBoard(board):
+    """Inverse of packBoard: return the 16 tile numbers in row-major order."""
+    tiles = []
+    for byte in board.to_bytes(8, 'little'):
+        tiles += BYTE_TILES[byte]
+    return tiles
+
+GOAL_BOARD = packBoard([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0])
+
+class PackedFifteenPuzzleState:
+    """
+    Compact alternative to FifteenPuzzleState. Cell (row, col) lives in the
+    nibble at bits 4 * (row * 4 + col) of a single int, so a move is a pair of
+    shifts and xors, equality and hashing are int operations, and each state
+    costs one small object instead of five lists.
+    """
+    __slots__ = ('board', 'blank', 'h')
+
+    def __init__(self, numbers):
+        self.board = packBoard(numbers)
+        self.blank = numbers.index(0)  # Index (row * 4 + col) of the blank cell
+
+    @classmethod
+    def fromBoard(cls, board, blank=None):
+        """Build a state straight from a packed board, skipping the list round trip."""
+        state = cls.__new__(cls)
+        state.board = board
+        if blank is None:
+            blank = next(i for i in range(16) if (board >> (4 * i)) & 0xF == 0)
+        state.blank = blank
+        return state
+
+    @classmethod
+    def fromState(cls, state):
+        """Convert a list-based FifteenPuzzleState."""
+        return cls([tile for row in state.cells for tile in row])
+
+    @property
+    def cells(self):
+        # Rebuilt on demand so heuristics written against FifteenPuzzleState keep working
+        numbers = unpackBoard(self.board)
+        return [numbers[row * 4:row * 4 + 4] for row in range(4)]
+
+    @property
+    def blankLocation(self):
+        return divmod(self.blank, 4)
+
+    @property
+    def key(self):
+        # Same packed board as FifteenPuzzleState.key
+        return self.board
+
+    def __str__(self):
+        return asciiString(self.cells)
+
+    def __eq__(self, other):
+        return isinstance(other, PackedFifteenPuzzleState) and self.board == other.board
+
+    def __hash__(self):
+        return hash(self.board)
+
+    def __lt__(self, other):
+        return self.board < other.board
+
+    def tiles(self):
+        return unpackBoard(self.board)
+
+    def isGoal(self):
+        return self.board == GOAL_BOARD
+
+    def legalMoves(self):
+        return list(LEGAL_MOVES[self.blank])
+
+    def result(self, move):
+        blank = self.blank
+        target = blank + MOVE_OFFSETS[moveCode(move)]
+        tile = (self.board >> (4 * target)) & 0xF
+        # The blank nibble is zero, so xor moves the tile into it and clears its old cell
+        board = self.board ^ (tile << (4 * target)) ^ (tile << (4 * blank))
+        return PackedFifteenPuzzleState.fromBoard(board, target)
+
+    def expand(self, previousMove=None):
+        """
+        Children as (state, move code) pairs straight from MOVE_TABLE, leaving
+        out the move that undoes previousMove (a move code) if one is given.
+        """
+        skip = INVERSE_CODES[previousMove] if previousMove is not None else None
+        board = self.board
+        blank = self.blank
+        children = []
+        for code, target in MOVE_TABLE[blank]:
+            if code != skip:
+                tile = (board >> (4 * target)) & 0xF
+                child = PackedFifteenPuzzleState.__new__(PackedFifteenPuzzleState)
+                child.board = board ^ (tile << (4 * target)) ^ (tile << (4 * blank))
+                child.blank = target
+                children.append((child, code))
+        return children
+
 class FifteenPuzzleSearchProblem(search.SearchProblem):
-    def __init__(self, puzzle):
+    def __init__(self, puzzle, heuristic=None):
         self.puzzle = puzzle
         self.expanded_nodes = 0  # Track how many nodes have been expanded
         self.max_fringe_size = 0  # Track the maximum size of the fringe
+        self.heuristic = None
+        if heuristic is not None:
+            self.setHeuristic(heuristic)
+
+    def setHeuristic(self, heuristic):
+        """
+        Have getSuccessors store the heuristic value of every state it returns
+        in state.h, updated from the parent's value with heuristic.delta
+        instead of being recomputed. Returns False (and stores nothing) for
+        heuristics without a delta function.
+        """
+        if getattr(heuristic, 'delta', None) is None:
+            self.heuristic = None
+            return False
+        self.heuristic = heuristic
+        self.puzzle.h = heuristic(self.puzzle, self)
+        return True
 
     def getStartState(self):
         return self.puzzle
 
+    def getGoalState(self):
+        # Same state class as the start, so bidirectional searches can meet in one dictionary
+        return type(self.puzzle)([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0])
+
     def isGoalState(self, state):
         return state.isGoal()
 
-    def getSuccessors(self, state):
-        successors = []
-        for action in state.legalMoves():
-            successor = state.result(action)
-            successors.append((successor, action, 1))  # Cost is 1 for all moves
-        return successors
+    def getSuccessors(self, state, previousAction=None):
+        """
+        (successor, move name, 1) triples. Given the move that led to state,
+        the move undoing it is left out without being generated (see expand).
+        """
+        children = state.expand(MOVE_CODES[previousAction] if previousAction is not None else None)
+        if self.heuristic is not None:
+            delta = self.heuristic.delta
+            row, col = state.blankLocation
+            blank = row * 4 + col
+            tiles = state.tiles()
+            for successor, move in children:
+                # The tile next to the blank slides into the blank's old cell
+                neighbour = blank + MOVE_OFFSETS[move]
+                successor.h = state.h + delta(tiles[neighbour], neighbour, blank, tiles)
+        return [(successor, MOVE_NAMES[move], 1) for successor, move in children]  # Cost is 1 for all moves
 
     def getCostOfActions(self, actions):
         return len(actions)
 
-def createRandomFifteenPuzzle(moves=100):
-    puzzle = FifteenPuzzleState([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0])
+    def inverseAction(self, action):
+        return INVERSE_MOVES[action]
+
+def createRandomFifteenPuzzle(moves=100, packed=False):
+    stateClass = PackedFifteenPuzzleState if packed else FifteenPuzzleState
+    puzzle = stateClass([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0])
     for _ in range(moves):
         puzzle = puzzle.result(random.choice(puzzle.legalMoves()))
     return puzzle
@@ -145,7 +311,10 @@ if __name__ == '__main__':
             '1': ('Misplaced Tiles', search.H1),
             '2': ('Euclidean Distance', search.H2),
             '3': ('Manhattan Distance', search.H3),
-            '4': ('Heuristic based on Row/Column Misalignment', search.H4)
+            '4': ('Heuristic based on Row/Column Misalignment', search.H4),
+            '5': ('Pattern Database', search.H5),
+            '6': ('Manhattan Distance + Linear Conflict', search.H6),
+            '7': ('Walking Distance', search.H7)
         }
 
         print("Choose a heuristic for A* search:")
@@ -153,9 +322,12 @@ if __name__ == '__main__':
         print("2: Euclidean Distance - Measures the straight-line distance of each tile to its goal.")
         print("3: Manhattan Distance - Measures the number of moves each tile is away from its goal position.")
         print("4: Heuristic based on Row/Column Misalignment - Counts the number of tiles not in their goal row/column.")
+        print("5: Pattern Database - Adds exact move counts of disjoint tile groups, precomputed once and cached on disk.")
+        print("6: Manhattan Distance + Linear Conflict - Adds two moves for each tile that must step aside to let a tile in its row/column pass.")
+        print("7: Walking Distance - Counts the moves needed to bring every tile to its goal row and to its goal column, using a precomputed table.")
         print("Press any other letter to exit.")
         
-        heuristic_choice = input("Choose heuristic (1, 2, 3, 4): ").strip()
+        heuristic_choice = input("Choose heuristic (1, 2, 3, 4, 5, 6, 7): ").strip()
 
         if heuristic_choice in heuristics:
             heuristic_name, heuristic = heuristics[heuristic_choice]
@@ -168,15 +340,15 @@ if __name__ == '__main__':
 
     elif method_choice == '1':
         print("You chose Uniform Cost Search (UCS).")
-        path = search.uniformCostSearch(problem)
+        path = search.uniformCostSearch(problem).get('Solution')
 
     elif method_choice == '2':
         print("You chose Breadth-First Search (BFS).")
-        path = search.breadthFirstSearch(problem)
+        path = search.breadthFirstSearch(problem).get('Solution')
 
     elif method_choice == '3':
         print("You chose Depth-First Search (DFS).")
-        path = search.depthFirstSearch(problem)
+        path = search.depthFirstSearch(problem).get('Solution')
 
     else:
         print("Exiting the program.")
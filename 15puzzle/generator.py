@@ -1,39 +1,123 @@
 import csv
 import random
+import sys
+import binaryformat
 import fifteenpuzzle as F  # Make sure you have this module set up properly
+import search
+
+GOAL = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0]
 
 def get_inversions(arr):
     """
-    Count the number of inversions in the puzzle.
+    Count the number of inversions in the puzzle (pairs of tiles in the wrong
+    order, ignoring the blank). One pass: a bitmask records the tiles seen so
+    far, and each tile adds the number of larger tiles already seen.
     """
     inv_count = 0
-    for i in range(len(arr)):
-        for j in range(i + 1, len(arr)):
-            if arr[i] > arr[j] and arr[i] != 0 and arr[j] != 0:
-                inv_count += 1
+    seen = 0
+    for tile in arr:
+        if tile != 0:
+            inv_count += bin(seen >> tile).count('1')
+            seen |= 1 << tile
     return inv_count
 
 def is_solvable(puzzle):
     """
-    Check if the puzzle is solvable based on inversions.
+    Check if the puzzle is solvable based on inversions. On a 4x4 board a
+    move up or down changes the inversion parity and the blank's row, so a
+    board can reach the goal (no inversions, blank on the bottom row) exactly
+    when inversions + blank row counted from the bottom (1-4) is odd.
     """
-    inv_count = get_inversions([num for row in puzzle for num in row])
-    return inv_count % 2 == 0
+    numbers = [num for row in puzzle for num in row]
+    blank_row_from_bottom = 4 - numbers.index(0) // 4
+    return (get_inversions(numbers) + blank_row_from_bottom) % 2 == 1
 
-def generate_scenarios(filename, count):
+def random_solvable_board(rng=random):
     """
-    Generate solvable 15-puzzle configurations and write to CSV.
+    Uniformly random solvable board as a flat list. A random permutation is
+    drawn; if it is unsolvable, swapping two tiles flips its parity. That swap
+    pairs unsolvable and solvable boards one to one, so the result is uniform.
+    """
+    numbers = GOAL[:]
+    rng.shuffle(numbers)
+    if not is_solvable([numbers]):
+        first, second = [i for i, num in enumerate(numbers) if num != 0][:2]
+        numbers[first], numbers[second] = numbers[second], numbers[first]
+    return numbers
+
+def random_walk_board(moves, rng=random):
+    """Board reached from the goal by a random walk that never undoes its last move."""
+    state = F.PackedFifteenPuzzleState(GOAL)
+    previous = None
+    for _ in range(moves):
+        state, previous = rng.choice(state.expand(previous))
+    return state.tiles()
+
+def sample_boards(count, rng=random, heuristic=None, min_value=0, max_value=float('inf'),
+                  min_depth=None, max_depth=None, walk_length=None):
+    """
+    Yield count solvable boards (flat lists) one at a time.
+
+    Without depth bounds, boards are uniform over all solvable boards and are
+    kept when heuristic(board) lies in [min_value, max_value] (every board is
+    kept if no heuristic is given). With min_depth/max_depth, boards come
+    from random walks of walk_length moves (default 2 * max_depth) and are
+    kept when their optimal solution length, found with IDA* and the pattern
+    database heuristic, lies in [min_depth, max_depth].
     """
+    by_depth = min_depth is not None or max_depth is not None
+    if by_depth:
+        min_depth = min_depth or 0
+        max_depth = max_depth if max_depth is not None else 80
+        walk_length = walk_length or 2 * max_depth
+    generated = 0
+    while generated < count:
+        if by_depth:
+            numbers = random_walk_board(walk_length, rng)
+            state = F.PackedFifteenPuzzleState(numbers)
+            if search.H5(state) > max_depth:
+                continue  # Too deep for sure, skip the search
+            depth = search.idaStarSearch(F.FifteenPuzzleSearchProblem(state), search.H5)['Depth']
+            if not min_depth <= depth <= max_depth:
+                continue
+        else:
+            numbers = random_solvable_board(rng)
+            if heuristic is not None:
+                value = heuristic(F.PackedFifteenPuzzleState(numbers))
+                if not min_value <= value <= max_value:
+                    continue
+        generated += 1
+        yield numbers
+
+def write_scenarios(boards, filename, binary=False):
+    """
+    Stream boards to filename as they are produced: comma-separated rows, or
+    with binary=True a packed scenario file (see binaryformat.py). Returns
+    the number written.
+    """
+    if binary:
+        return binaryformat.write_boards((F.packBoard(numbers) for numbers in boards), filename)
+    written = 0
     with open(filename, 'w', newline='') as f:
         writer = csv.writer(f)
-        generated = 0
-        while generated < count:
-            puzzle = F.createRandomFifteenPuzzle(100)  # Create a random 15-puzzle
-            if is_solvable(puzzle.cells):  # Check if the puzzle is solvable
-                writer.writerow([num for row in puzzle.cells for num in row])
-                print(f"Generated solvable puzzle #{generated + 1}")
-                generated += 1
+        for numbers in boards:
+            writer.writerow(numbers)
+            written += 1
+    return written
+
+def generate_scenarios(filename, count, rng=random):
+    """
+    Generate solvable 15-puzzle configurations and write to CSV.
+    """
+    write_scenarios(sample_boards(count, rng), filename)
     print(f"{count} solvable puzzles generated and saved to {filename}")
 
 if __name__ == "__main__":
-    generate_scenarios("scenarios.csv", 250)  # Generate 250 random solvable puzzles
+    # python generator.py [count] [filename]; a .bin filename selects the packed binary format
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 250  # 250 random solvable puzzles by default
+    filename = sys.argv[2] if len(sys.argv) > 2 else "scenarios.csv"
+    if filename.endswith('.bin'):
+        write_scenarios(sample_boards(count), filename, binary=True)
+        print(f"{count} solvable puzzles generated and saved to {filename}")
+    else:
+        generate_scenarios(filename, count)
@@ -0,0 +1,161 @@
+"""
+In instrumentation.py, we collect the statistics every search in search.py
+reports. A search creates one SearchStats, keeps its counters in local
+variables and hands them over at checkpoints and when it finishes, so the
+hot loops only pay for an integer test per expansion:
+
+    stats = SearchStats('aStarSearch', limits)
+    heuristic = stats.timeHeuristic(heuristic)
+    ...
+    if not expandedNodes & stats.mask:
+        if stats.checkpoint(expandedNodes, generatedNodes, len(frontier), len(visited)):
+            break
+    ...
+    return stats.result(actions, expandedNodes, generatedNodes, duplicates, maxFringeSize)
+
+Every result dict has the keys of RESULT_FIELDS, plus 'Solution' (the list
+of actions or None), 'Samples' and any keys specific to the search. A sample
+(Time, Expanded Nodes, Generated Nodes, Open Size, Closed Size) is taken
+every SAMPLE_EVERY expansions. With util.SearchLimits, checkpoints also tell
+the search when to give up; its result then has 'Status' 'Timed Out',
+'Node Budget' or 'Cancelled' instead of 'Solved' or 'No Solution', and the
+counts up to that point. Heuristic calls are all counted but only one
+in HEURISTIC_TIMING_EVERY is timed, and the total time is extrapolated from
+those. Incremental heuristic updates (see `delta` in search.py) are not
+heuristic calls.
+
+writeCSV, writeSamplesCSV and writeJSON export lists of results.
+"""
+
+import csv
+import json
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+SAMPLE_EVERY = 1024
+HEURISTIC_TIMING_EVERY = 16
+
+RESULT_FIELDS = ['Algorithm', 'Solved', 'Status', 'Depth', 'Expanded Nodes', 'Generated Nodes', 'Max Fringe Size',
+                 'Time', 'Expanded Per Second', 'Generated Per Second', 'Heuristic Calls', 'Heuristic Time',
+                 'Duplicate Hits', 'Duplicate Rate', 'Peak RSS']
+SAMPLE_FIELDS = ['Time', 'Expanded Nodes', 'Generated Nodes', 'Open Size', 'Closed Size']
+
+def peakRSS():
+    """Peak resident set size of this process so far in bytes, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class SearchStats:
+    """
+    Statistics of one search run, which stops at the util.SearchLimits given.
+    sampleEvery must be a power of two; the search tests
+    `not expandedNodes & stats.mask` to decide when to call checkpoint.
+    """
+    def __init__(self, algorithm, limits=None, sampleEvery=SAMPLE_EVERY):
+        self.algorithm = algorithm
+        self.limits = limits
+        self.sampleMask = sampleEvery - 1
+        self.mask = min(sampleEvery, limits.checkEvery) - 1 if limits is not None else self.sampleMask
+        self.stopped = None  # Why the limits stopped the search
+        self.samples = []
+        self.heuristicCalls = 0
+        self.timedCalls = 0
+        self.timedSeconds = 0.0
+        self.startTime = time.time()
+
+    def timeHeuristic(self, heuristic):
+        """
+        Wrap heuristic so that its calls are counted and sampled for time.
+        The wrapper keeps the heuristic's `delta`, so incremental evaluation
+        still works.
+        """
+        stats = self
+        timingMask = HEURISTIC_TIMING_EVERY - 1
+
+        def timed(state, problem=None):
+            calls = stats.heuristicCalls
+            stats.heuristicCalls = calls + 1
+            if calls & timingMask:
+                return heuristic(state, problem)
+            start = time.perf_counter()
+            value = heuristic(state, problem)
+            stats.timedSeconds += time.perf_counter() - start
+            stats.timedCalls += 1
+            return value
+
+        if hasattr(heuristic, 'delta'):
+            timed.delta = heuristic.delta
+        timed.__name__ = getattr(heuristic, '__name__', type(heuristic).__name__)
+        return timed
+
+    def addHeuristicCalls(self, calls, seconds):
+        """Record calls timed together, such as one batch evaluation of many boards."""
+        self.heuristicCalls += calls
+        self.timedCalls += calls
+        self.timedSeconds += seconds
+
+    def sample(self, expandedNodes, generatedNodes, openSize, closedSize):
+        self.samples.append((time.time() - self.startTime, expandedNodes, generatedNodes, openSize, closedSize))
+
+    def checkpoint(self, expandedNodes, generatedNodes, openSize, closedSize):
+        """Sample if it is time to, and return True if the search must stop."""
+        if not expandedNodes & self.sampleMask:
+            self.sample(expandedNodes, generatedNodes, openSize, closedSize)
+        if self.limits is not None:
+            self.stopped = self.limits.exceeded(expandedNodes)
+        return self.stopped is not None
+
+    def result(self, solution, expandedNodes, generatedNodes, duplicates, maxFringeSize, **extra):
+        """Build the result dict; extra keys (such as 'Pruned Nodes') are added as given."""
+        elapsed = time.time() - self.startTime
+        result = {
+            'Algorithm': self.algorithm,
+            'Solved': solution is not None,
+            'Status': 'Solved' if solution is not None else self.stopped or 'No Solution',
+            'Solution': solution,
+            'Depth': len(solution) if solution is not None else 0,
+            'Expanded Nodes': expandedNodes,
+            'Generated Nodes': generatedNodes,
+            'Max Fringe Size': maxFringeSize,
+            'Time': elapsed,
+            'Expanded Per Second': expandedNodes / elapsed if elapsed > 0 else 0.0,
+            'Generated Per Second': generatedNodes / elapsed if elapsed > 0 else 0.0,
+            'Heuristic Calls': self.heuristicCalls,
+            'Heuristic Time': self.timedSeconds / self.timedCalls * self.heuristicCalls if self.timedCalls else 0.0,
+            'Duplicate Hits': duplicates,
+            'Duplicate Rate': duplicates / generatedNodes if generatedNodes else 0.0,
+            'Peak RSS': peakRSS(),
+            'Samples': self.samples
+        }
+        result.update(extra)
+        return result
+
+def writeCSV(results, filename):
+    """One row per result with the RESULT_FIELDS (other keys are left out)."""
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(RESULT_FIELDS)
+        for result in results:
+            writer.writerow([result.get(field) for field in RESULT_FIELDS])
+
+def writeSamplesCSV(results, filename):
+    """One row per sample, prefixed with the index and algorithm of its result."""
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Run', 'Algorithm'] + SAMPLE_FIELDS)
+        for run, result in enumerate(results):
+            for sample in result.get('Samples', ()):
+                writer.writerow([run, result.get('Algorithm')] + list(sample))
+
+def writeJSON(results, filename):
+    """The full results, samples included, as a JSON list."""
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=1, default=str)
@@ -0,0 +1,265 @@
+"""
+In parallelsearch.py, we run A* on several processes at once with
+hash-distributed A* (HDA*, Kishimoto, Fukunaga and Botea, 2009).
+
+Every board is owned by one worker, picked by a hash of the packed board.
+Each worker keeps the open and closed lists of the boards it owns and
+expands its best open node; successors it owns go straight into its own
+lists, the others are buffered and sent to their owners in batches, so the
+cost of a message is shared by many nodes. The heuristic value travels with
+each node, so it is computed once (incrementally, like in aStarSearch)
+where the node is generated.
+
+The goal's owner keeps the cost of the best solution found so far, the
+incumbent, in shared memory; every worker drops nodes whose f is not below
+it. A worker is idle when it has nothing left below the incumbent. The
+search is over when a scan of every worker's idle flag and sent and received
+message counts finds them all idle with every message received, and a
+second scan finds the same counts: no worker can become busy again without
+receiving a message. With an admissible heuristic every node with f below
+the incumbent has then been expanded, so the incumbent is optimal; the
+lowest f left open anywhere is reported as 'Lower Bound' and checked
+against it ('Optimal').
+
+The moves are then read back by following the parent of each board from
+owner to owner, starting from the goal.
+
+If a worker dies (an exception in the heuristic, or killed for running out
+of memory), the coordinator notices its exit code instead of waiting for it
+and ends the search with 'Status' 'Worker Failed'.
+"""
+
+import multiprocessing
+import queue
+import time
+import instrumentation
+import search
+import util
+from fifteenpuzzle import PackedFifteenPuzzleState, MOVE_CODES, MOVE_NAMES, GOAL_BOARD
+
+BATCH_SIZE = 256      # Nodes per message
+EXPAND_CHUNK = 64     # Expansions between inbox checks and flushes
+POLL_INTERVAL = 0.002
+
+MASK64 = (1 << 64) - 1
+
+class _WorkerFailed(Exception):
+    pass
+
+def owner(board, workers):
+    # Fibonacci hashing; the high bits of the product mix all the cells
+    return (((board * 0x9E3779B97F4A7C15) & MASK64) >> 32) % workers
+
+def _hdaWorker(index, workers, problem, heuristic, inboxes, replies, shared):
+    incumbent, idle, sent, received, expanded, generated, openSizes = shared
+    inbox = inboxes[index]
+    incremental = problem.setHeuristic(heuristic)
+    start = problem.getStartState()
+    startH = start.h if incremental else heuristic(start, problem)
+    frontier = util.BucketPriorityQueue() if isinstance(startH, int) else util.IndexedPriorityQueue()
+    known = {}  # Board -> (g, parent board, move code) of the cheapest path seen
+    outboxes = [[] for _ in range(workers)]
+    expandedNodes = 0
+    generatedNodes = 0
+    duplicates = 0
+    maxOpenSize = 0
+
+    def accept(board, blank, g, h, parent, move):
+        nonlocal duplicates
+        seen = known.get(board)
+        if seen is not None and seen[0] <= g:
+            duplicates += 1
+            return
+        known[board] = (g, parent, move)
+        if board == GOAL_BOARD:
+            if g < incumbent.value:
+                incumbent.value = g
+        elif g + h < incumbent.value:
+            state = PackedFifteenPuzzleState.fromBoard(board, blank)
+            state.h = h
+            frontier.update(board, (state, g), g + h, h)
+
+    def send(target):
+        batch = outboxes[target]
+        # Counted before it is sent, so received never runs ahead of sent
+        sent[index] += len(batch)
+        inboxes[target].put(batch)
+        outboxes[target] = []
+
+    def receive(message):
+        # Returns the control message, if it is one
+        if isinstance(message, tuple):
+            return message
+        idle[index] = 0  # Busy before the message counts as received
+        received[index] += len(message)
+        for node in message:
+            accept(*node)
+        return None
+
+    if owner(start.board, workers) == index:
+        accept(start.board, start.blank, 0, startH, None, None)
+
+    control = None
+    while control is None:
+        try:
+            while control is None:
+                control = receive(inbox.get_nowait())
+        except queue.Empty:
+            pass
+        if control is not None:
+            break
+        if not frontier.isEmpty() and frontier.topPriority() < incumbent.value:
+            idle[index] = 0
+            for _ in range(EXPAND_CHUNK):
+                if frontier.isEmpty() or frontier.topPriority() >= incumbent.value:
+                    break
+                board, (state, g), _ = frontier.popEntry()
+                expandedNodes += 1
+                for successor, action, stepCost in problem.getSuccessors(state):
+                    generatedNodes += 1
+                    h = successor.h if incremental else heuristic(successor, problem)
+                    node = (successor.board, successor.blank, g + stepCost, h, board, MOVE_CODES[action])
+                    target = owner(successor.board, workers)
+                    if target == index:
+                        accept(*node)
+                    else:
+                        outboxes[target].append(node)
+                        if len(outboxes[target]) >= BATCH_SIZE:
+                            send(target)
+            maxOpenSize = max(maxOpenSize, len(frontier))
+            expanded[index] = expandedNodes
+            generated[index] = generatedNodes
+            openSizes[index] = len(frontier)
+        for target in range(workers):
+            if outboxes[target]:
+                send(target)
+        if frontier.isEmpty() or frontier.topPriority() >= incumbent.value:
+            idle[index] = 1
+            try:
+                control = receive(inbox.get(timeout=POLL_INTERVAL))
+            except queue.Empty:
+                pass
+
+    # Stopped: report, then answer parent lookups until told to exit
+    lowest = frontier.topPriority() if not frontier.isEmpty() else float('inf')
+    replies.put((index, expandedNodes, generatedNodes, duplicates, maxOpenSize, lowest))
+    while control[0] != 'exit':
+        if control[0] == 'parent':
+            replies.put(known.get(control[1]))
+        control = inbox.get()
+        while not isinstance(control, tuple):  # Batches still in flight when a limit stopped the search
+            control = inbox.get()
+
+def hdaStarSearch(problem, heuristic=search.nullHeuristic, workers=None, limits=None):
+    """
+    A* spread over `workers` processes (default: one per CPU) with HDA*; see
+    the module docstring. problem is a FifteenPuzzleSearchProblem. The
+    result is the same dict as aStarSearch's (counts summed over the
+    workers, 'Max Fringe Size' the sum of their largest open lists) plus
+    'Workers', 'Lower Bound' and 'Optimal'. It stops at the util.SearchLimits
+    given, checked by the coordinating process every few milliseconds. If a
+    worker dies, the search stops with 'Status' 'Worker Failed' and the
+    counts the workers last published.
+
+    The workers are forked (or spawned) per search, so the heuristic must be
+    picklable on platforms without fork, such as the H1-H7 functions.
+    """
+    stats = instrumentation.SearchStats('hdaStarSearch', limits)
+    workers = workers or multiprocessing.cpu_count()
+    start = problem.getStartState()
+    if not isinstance(start, PackedFifteenPuzzleState):
+        start = PackedFifteenPuzzleState.fromState(start)
+        problem = type(problem)(start)
+    if start.board == GOAL_BOARD:
+        return stats.result([], 0, 0, 0, 0, Workers=workers, **{'Lower Bound': 0, 'Optimal': True})
+    heuristic(start, problem)  # Load any tables once, before the workers fork
+
+    context = multiprocessing.get_context()
+    incumbent = context.RawValue('d', float('inf'))  # Only the goal's owner writes it
+    counters = [context.RawArray('q', workers) for _ in range(6)]
+    idle, sent, received, expanded, generated, openSizes = counters
+    inboxes = [context.Queue() for _ in range(workers)]
+    replies = context.Queue()
+    processes = [context.Process(target=_hdaWorker, daemon=True,
+                                 args=(index, workers, problem, heuristic, inboxes, replies,
+                                       (incumbent, idle, sent, received, expanded, generated, openSizes)))
+                 for index in range(workers)]
+    for process in processes:
+        process.start()
+
+    def scan():
+        if any(process.exitcode is not None for process in processes):
+            raise _WorkerFailed()
+        return list(idle), list(sent), list(received)
+
+    def reply():
+        # The next reply, checking that every worker is still alive while waiting
+        while True:
+            try:
+                return replies.get(timeout=0.1)
+            except queue.Empty:
+                scan()
+
+    try:
+        previous = None
+        lastSample = time.time()
+        while True:
+            time.sleep(POLL_INTERVAL)
+            current = scan()
+            if all(current[0]) and sum(current[1]) == sum(current[2]) and current == previous:
+                break
+            previous = current
+            expandedNodes = sum(expanded)
+            if time.time() - lastSample >= 0.05:
+                stats.sample(expandedNodes, sum(generated), sum(openSizes), None)
+                lastSample = time.time()
+            if limits is not None:
+                stats.stopped = limits.exceeded(expandedNodes)
+                if stats.stopped is not None:
+                    break
+
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        reports = [reply() for _ in range(workers)]
+        expandedNodes = sum(report[1] for report in reports)
+        generatedNodes = sum(report[2] for report in reports)
+        duplicates = sum(report[3] for report in reports)
+        maxFringeSize = sum(report[4] for report in reports)
+        lowerBound = min(report[5] for report in reports)
+
+        actions = None
+        cost = incumbent.value
+        if stats.stopped is None and cost < float('inf'):
+            actions = []
+            board = GOAL_BOARD
+            while True:
+                inboxes[owner(board, workers)].put(('parent', board))
+                _, parent, move = reply()
+                if parent is None:
+                    break
+                actions.append(MOVE_NAMES[move])
+                board = parent
+            actions.reverse()
+        for inbox in inboxes:
+            inbox.put(('exit',))
+        for process in processes:
+            process.join()
+    except _WorkerFailed:
+        stats.stopped = 'Worker Failed'
+        actions = None
+        expandedNodes = sum(expanded)
+        generatedNodes = sum(generated)
+        duplicates = 0
+        maxFringeSize = sum(openSizes)
+        lowerBound = 0
+        cost = incumbent.value
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    return stats.result(actions, expandedNodes, generatedNodes, duplicates, maxFringeSize,
+                        Workers=workers, **{'Lower Bound': min(lowerBound, cost),
+                                            'Optimal': actions is not None and lowerBound >= cost})
+
+hdastar = hdaStarSearch
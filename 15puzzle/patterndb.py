@@ -0,0 +1,147 @@
+"""
+In patterndb.py, we build and load additive disjoint pattern databases for the
+15-puzzle. The tiles are split into disjoint groups; for each group a table
+stores the minimum number of moves of that group's tiles needed to bring them
+home, ignoring every other tile. Only moves of the group's own tiles are
+counted, so the values of the different groups can be added and the sum is
+still admissible.
+
+Tables are indexed by the positions of the group's tiles packed as nibbles
+(tile i of the group at bits 4*i), i.e. a group of k tiles takes 16**k bytes.
+They are built once by a backward breadth-first search from the goal, saved
+to disk and memory-mapped on later runs.
+"""
+
+import mmap
+import os
+
+# 5-5-5 split: top-left block, right-hand column, bottom-left block.
+DEFAULT_PARTITION = ((1, 2, 3, 5, 6), (4, 7, 8, 11, 12), (9, 10, 13, 14, 15))
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdb')
+
+# Cells the blank can swap with, for each blank position
+NEIGHBOURS = [
+    [n for n, ok in ((cell - 4, cell >= 4), (cell + 4, cell < 12),
+                     (cell - 1, cell % 4 != 0), (cell + 1, cell % 4 != 3)) if ok]
+    for cell in range(16)
+]
+
+UNSEEN = 255
+
+def buildPattern(tiles):
+    """
+    Build the table for one group of tiles and return it as a bytearray.
+
+    The search runs over (group tile positions, blank position). Moving a
+    group tile costs 1 and moving any other tile costs 0, so states are
+    processed in cost layers: each layer is first closed under the free
+    moves, then the next layer is generated by moving a group tile. The
+    table keeps, for every placement of the group, the cost of the first
+    layer it appears in, which is the minimum over all blank positions.
+    """
+    k = len(tiles)
+    shift = 4 * k
+    size = 16 ** k
+    table = bytearray([UNSEEN]) * size
+    seen = bytearray(size * 16)
+
+    goal = 0
+    for i, tile in enumerate(tiles):
+        goal |= (tile - 1) << (4 * i)
+    start = goal | (15 << shift)  # Blank in the bottom-right corner
+    seen[start] = 1
+    current = [start]
+    cost = 0
+
+    while current:
+        # Close the layer under moves of tiles outside the group
+        layer = []
+        stack = current
+        while stack:
+            key = stack.pop()
+            layer.append(key)
+            index = key & (size - 1)
+            if table[index] == UNSEEN:
+                table[index] = cost
+            occupied = 0
+            for i in range(k):
+                occupied |= 1 << ((index >> (4 * i)) & 0xF)
+            for cell in NEIGHBOURS[key >> shift]:
+                if not (occupied >> cell) & 1:
+                    nextKey = index | (cell << shift)
+                    if not seen[nextKey]:
+                        seen[nextKey] = 1
+                        stack.append(nextKey)
+
+        # Moving one of the group's tiles into the blank costs one move
+        current = []
+        for key in layer:
+            index = key & (size - 1)
+            blank = key >> shift
+            for i in range(k):
+                cell = (index >> (4 * i)) & 0xF
+                if cell in NEIGHBOURS[blank]:
+                    nextKey = (index ^ (cell << (4 * i)) ^ (blank << (4 * i))) | (cell << shift)
+                    if not seen[nextKey]:
+                        seen[nextKey] = 1
+                        current.append(nextKey)
+        cost += 1
+
+    return table
+
+def patternFilename(tiles, directory=DEFAULT_DIRECTORY):
+    return os.path.join(directory, 'pdb_' + '_'.join(map(str, tiles)) + '.bin')
+
+def loadPattern(tiles, directory=DEFAULT_DIRECTORY):
+    """
+    Memory-map the table for a group of tiles, building and saving it first
+    if it is not on disk yet.
+    """
+    filename = patternFilename(tiles, directory)
+    if not os.path.exists(filename):
+        os.makedirs(directory, exist_ok=True)
+        table = buildPattern(tiles)
+        temporary = '%s.%d.tmp' % (filename, os.getpid())
+        with open(temporary, 'wb') as f:
+            f.write(table)
+        os.replace(temporary, filename)  # Never leave a half-written table behind
+    with open(filename, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def tilePositions(state):
+    """Return a list mapping each tile number (0 = blank) to its cell index."""
+    positions = [0] * 16
+    board = getattr(state, 'board', None)
+    if board is not None:
+        for cell in range(16):
+            positions[(board >> (4 * cell)) & 0xF] = cell
+    else:
+        cell = 0
+        for row in state.cells:
+            for tile in row:
+                positions[tile] = cell
+                cell += 1
+    return positions
+
+class PatternDatabase:
+    """
+    Additive pattern database heuristic. Instances are called like the other
+    heuristics in search.py: heuristic(state, problem).
+    """
+    def __init__(self, partition=DEFAULT_PARTITION, directory=DEFAULT_DIRECTORY):
+        tiles = sorted(tile for group in partition for tile in group)
+        if len(tiles) != len(set(tiles)) or not set(tiles) <= set(range(1, 16)):
+            raise Exception("Pattern groups must be disjoint sets of tiles 1-15")
+        self.partition = [tuple(group) for group in partition]
+        self.tables = [loadPattern(group, directory) for group in self.partition]
+
+    def __call__(self, state, problem=None):
+        positions = tilePositions(state)
+        total = 0
+        for group, table in zip(self.partition, self.tables):
+            index = 0
+            for i, tile in enumerate(group):
+                index |= positions[tile] << (4 * i)
+            total += table[index]
+        return total
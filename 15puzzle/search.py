@@ -16,9 +16,13 @@ In search.py, we implement generic search algorithms that can be used with diffe
 and are compatible with external scripts for automation and further analysis.
 """
 
+import heapq
 import math
 import time
 import util
+import instrumentation
+import patterndb
+import walkingdistance
 
 class SearchProblem:
     """
@@ -75,175 +79,864 @@ def tinyMazeSearch(problem):
     w = Directions.WEST
     return [s, s, w, s, w, w, s, w]
 
-def depthFirstSearch(problem):
-    """Search the deepest nodes in the search tree first."""
+def depthFirstSearch(problem, table=None, limits=None, maxDepth=80):
+    """
+    Search the deepest nodes in the search tree first. Expanded states go in
+    an explored set, or, given a util.TranspositionTable, in that fixed-size
+    table: a state is then expanded again only if it is reached by a cheaper
+    path than the one stored. In that mode only the current path is kept,
+    like in idaStarSearch, and it is never longer than maxDepth moves (80
+    is enough for any 15-puzzle board), so memory is bounded by the table's
+    size at the cost of some repeated work. The table needs states with a
+    packed int `key`, like the puzzle states.
+
+    Like every search here, it stops early at the util.SearchLimits given,
+    and then reports why in 'Status' along with the counts so far.
+    """
+    stats = instrumentation.SearchStats('depthFirstSearch', limits)
+    if table is not None:
+        return _boundedDepthFirstSearch(problem, table, maxDepth, stats)
     frontier = util.Stack()
     explored = set()
-    frontier.push((problem.getStartState(), [], 0))  # (state, actions, current depth)
+    nodes = util.NodeTable()
+    frontier.push((problem.getStartState(), nodes.add(-1, None)))  # (state, node index)
     expanded_nodes = 0
+    generated_nodes = 0
+    duplicates = 0
     max_fringe_size = 0
 
     while not frontier.isEmpty():
-        state, actions, depth = frontier.pop()
-        if state not in explored:
-            explored.add(state)
-            expanded_nodes += 1
-
-            if problem.isGoalState(state):
-                return len(actions), expanded_nodes, max_fringe_size
+        state, node = frontier.pop()
+        if state in explored:
+            duplicates += 1
+            continue
+        explored.add(state)
+        expanded_nodes += 1
+        if not expanded_nodes & stats.mask:
+            if stats.checkpoint(expanded_nodes, generated_nodes, len(frontier), len(explored)):
+                break
 
-            for successor, action, _ in problem.getSuccessors(state):
-                frontier.push((successor, actions + [action], depth + 1))
-                max_fringe_size = max(max_fringe_size, len(frontier.list))
-
-    return None, expanded_nodes, max_fringe_size
-
-def breadthFirstSearch(problem):
-    """Search the shallowest nodes in the search tree first."""
-    frontier = util.Queue()
-    explored = set()
-    frontier.push((problem.getStartState(), [], 0))
+        if problem.isGoalState(state):
+            return stats.result(nodes.path(node), expanded_nodes, generated_nodes, duplicates, max_fringe_size)
+
+        cost = nodes.g[node]
+        for successor, action, step_cost in problem.getSuccessors(state):
+            frontier.push((successor, nodes.add(node, action, cost + step_cost)))
+            generated_nodes += 1
+            max_fringe_size = max(max_fringe_size, len(frontier.list))
+
+    return stats.result(None, expanded_nodes, generated_nodes, duplicates, max_fringe_size)
+
+def _boundedDepthFirstSearch(problem, table, maxDepth, stats):
+    # depthFirstSearch with a transposition table. levels holds the path
+    # cost and the successors not yet tried of each state on the current
+    # path, and path the actions leading to the state being looked at.
+    state = problem.getStartState()
+    cost = 0
+    path = []
+    levels = []
     expanded_nodes = 0
+    generated_nodes = 0
+    duplicates = 0
     max_fringe_size = 0
 
-    while not frontier.isEmpty():
-        state, actions, _ = frontier.pop()
-        if state not in explored:
-            explored.add(state)
+    while True:
+        seen = table.get(state.key)
+        if seen is not None and seen[0] <= cost:
+            duplicates += 1
+        else:
+            table.store(state.key, cost, 0)
             expanded_nodes += 1
-
+            if not expanded_nodes & stats.mask:
+                if stats.checkpoint(expanded_nodes, generated_nodes, len(levels), len(table)):
+                    break
             if problem.isGoalState(state):
-                return len(actions), expanded_nodes, max_fringe_size
-
-            for successor, action, _ in problem.getSuccessors(state):
-                frontier.push((successor, actions + [action], 0))
-                max_fringe_size = max(max_fringe_size, len(frontier.list))
-
-    return None, expanded_nodes, max_fringe_size
+                return stats.result(path, expanded_nodes, generated_nodes, duplicates, max_fringe_size)
+            if len(path) < maxDepth:
+                successors = problem.getSuccessors(state)
+                generated_nodes += len(successors)
+                levels.append((cost, iter(successors)))
+                max_fringe_size = max(max_fringe_size, len(levels))
+
+        # Back up to the deepest state with a successor left to try
+        successor = None
+        while levels and successor is None:
+            successor = next(levels[-1][1], None)
+            if successor is None:
+                levels.pop()
+        if successor is None:
+            break
+        state, action, step_cost = successor
+        cost = levels[-1][0] + step_cost
+        del path[len(levels) - 1:]
+        path.append(action)
+
+    return stats.result(None, expanded_nodes, generated_nodes, duplicates, max_fringe_size)
+
+def breadthFirstSearch(problem, frontier=None, limits=None):
+    """
+    Search the shallowest nodes in the search tree first. States are tested
+    for the goal and added to the seen set when they are generated, so each
+    state enters the queue at most once. frontier is the FIFO to use,
+    util.Queue() by default; util.SpillQueue() keeps most of it on disk.
+    """
+    stats = instrumentation.SearchStats('breadthFirstSearch', limits)
+    if frontier is None:
+        frontier = util.Queue()
+    start = problem.getStartState()
+    seen = {start}
+    nodes = util.NodeTable()
+    expanded_nodes = 0
+    generated_nodes = 0
+    duplicates = 0
+    max_fringe_size = 0
+    if problem.isGoalState(start):
+        return stats.result([], expanded_nodes, generated_nodes, duplicates, max_fringe_size)
+    frontier.push((start, nodes.add(-1, None)))
 
-def uniformCostSearch(problem):
+    while not frontier.isEmpty():
+        state, node = frontier.pop()
+        expanded_nodes += 1
+        if not expanded_nodes & stats.mask:
+            if stats.checkpoint(expanded_nodes, generated_nodes, len(frontier), len(seen) - len(frontier)):
+                break
+
+        for successor, action, _ in problem.getSuccessors(state):
+            generated_nodes += 1
+            if successor in seen:
+                duplicates += 1
+                continue
+            seen.add(successor)
+            child = nodes.add(node, action)
+            if problem.isGoalState(successor):
+                return stats.result(nodes.path(child), expanded_nodes, generated_nodes, duplicates, max_fringe_size)
+            frontier.push((successor, child))
+        max_fringe_size = max(max_fringe_size, len(frontier))
+
+    return stats.result(None, expanded_nodes, generated_nodes, duplicates, max_fringe_size)
+
+def uniformCostSearch(problem, limits=None):
     """Search the node of least total cost first."""
-    frontier = util.PriorityQueue()
+    stats = instrumentation.SearchStats('uniformCostSearch', limits)
+    frontier = util.IndexedPriorityQueue()
     explored = set()
-    frontier.push((problem.getStartState(), [], 0), 0)
+    nodes = util.NodeTable()
+    start = problem.getStartState()
+    frontier.push(start, nodes.add(-1, None), 0)
     expanded_nodes = 0
+    generated_nodes = 0
+    duplicates = 0
     max_fringe_size = 0
 
     while not frontier.isEmpty():
-        state, actions, cost = frontier.pop()
-        if state not in explored:
-            explored.add(state)
-            expanded_nodes += 1
-
-            if problem.isGoalState(state):
-                return len(actions), expanded_nodes, max_fringe_size
+        state, node, cost = frontier.popEntry()
+        explored.add(state)
+        expanded_nodes += 1
+        if not expanded_nodes & stats.mask:
+            if stats.checkpoint(expanded_nodes, generated_nodes, len(frontier), len(explored)):
+                break
 
-            for successor, action, step_cost in problem.getSuccessors(state):
-                new_actions = actions + [action]
-                new_cost = cost + step_cost
-                frontier.update((successor, new_actions, new_cost), new_cost)
-                max_fringe_size = max(max_fringe_size, len(frontier.heap))
-
-    return None, expanded_nodes, max_fringe_size
+        if problem.isGoalState(state):
+            return stats.result(nodes.path(node), expanded_nodes, generated_nodes, duplicates, max_fringe_size)
+
+        for successor, action, step_cost in problem.getSuccessors(state):
+            generated_nodes += 1
+            if successor in explored:
+                duplicates += 1
+                continue
+            new_cost = cost + step_cost
+            if new_cost < frontier.priority(successor):
+                frontier.update(successor, nodes.add(node, action, new_cost), new_cost)
+            else:
+                duplicates += 1
+        max_fringe_size = max(max_fringe_size, len(frontier))
+
+    return stats.result(None, expanded_nodes, generated_nodes, duplicates, max_fringe_size)
   #start of task 2
 def nullHeuristic(state, problem=None):
     """A trivial heuristic function that always returns 0."""
     return 0
 
 # Heuristic functions
+#
+# A heuristic can also be evaluated incrementally: if it has a `delta`
+# attribute, delta(tile, source, target, tiles) returns how much its value
+# changes when `tile` slides from cell index `source` to the blank at cell
+# index `target` of the board `tiles` (the parent's tiles in row-major
+# order, unpacked once for all its children; cells are numbered
+# row * 4 + col). A search problem with setHeuristic then carries the value
+# on each successor as `state.h`, and aStarSearch/idaStarSearch use that
+# instead of calling the heuristic again.
+
+GOAL_STATE = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0]
+
+# Goal cell of every tile (the blank belongs in the bottom-right corner)
+GOAL_CELLS = [15] + list(range(15))
+
+def manhattanTable(targetCells):
+    """[tile][cell] Manhattan distance from cell to targetCells[tile]; 0 for the blank."""
+    return [[0 if tile == 0 else abs(targetCells[tile] // 4 - cell // 4) + abs(targetCells[tile] % 4 - cell % 4)
+             for cell in range(16)] for tile in range(16)]
+
+# Per-tile, per-cell contributions of H1, H3 (and H6), H4 and H2, indexed [tile][cell]
+MISPLACED = [[int(tile != 0 and GOAL_STATE[cell] != tile) for cell in range(16)] for tile in range(16)]
+MANHATTAN = manhattanTable(GOAL_CELLS)
+MISALIGNED = [[0 if tile == 0 else int(GOAL_CELLS[tile] // 4 != cell // 4) + int(GOAL_CELLS[tile] % 4 != cell % 4)
+               for cell in range(16)] for tile in range(16)]
+EUCLIDEAN = [[0.0 if tile == 0 else ((GOAL_CELLS[tile] // 4 - cell // 4) ** 2 + (GOAL_CELLS[tile] % 4 - cell % 4) ** 2) ** 0.5
+              for cell in range(16)] for tile in range(16)]
+
 def H1(state, problem=None):
     """Number of misplaced tiles heuristic."""
-    goal_state = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0]
-    current_state = [tile for row in state.cells for tile in row]
-    return sum([1 for i in range(16) if current_state[i] != goal_state[i] and current_state[i] != 0])
+    return sum(MISPLACED[tile][cell] for cell, tile in enumerate(state.tiles()))
 
 def H2(state, problem=None):
     """Euclidean distance heuristic."""
-    goal_positions = {val: (val // 4, val % 4) for val in range(16)}
-    total_distance = 0
-    for r in range(4):
-        for c in range(4):
-            tile = state.cells[r][c]
-            if tile != 0:
-                goal_r, goal_c = goal_positions[tile]
-                total_distance += ((goal_r - r) ** 2 + (goal_c - c) ** 2) ** 0.5
-    return total_distance
+    return sum(EUCLIDEAN[tile][cell] for cell, tile in enumerate(state.tiles()))
 
 def H3(state, problem=None):
     """Manhattan distance heuristic."""
-    goal_positions = {val: (val // 4, val % 4) for val in range(16)}
-    total_distance = 0
-    for r in range(4):
-        for c in range(4):
-            tile = state.cells[r][c]
-            if tile != 0:
-                goal_r, goal_c = goal_positions[tile]
-                total_distance += abs(goal_r - r) + abs(goal_c - c)
-    return total_distance
+    return sum(MANHATTAN[tile][cell] for cell, tile in enumerate(state.tiles()))
 
 def H4(state, problem=None):
     """Heuristic based on tiles not in their goal row and/or column."""
-    goal_positions = {val: (val // 4, val % 4) for val in range(16)}
-    not_in_row = 0
-    not_in_column = 0
-    for r in range(4):
-        for c in range(4):
-            tile = state.cells[r][c]
-            if tile != 0:
-                goal_r, goal_c = goal_positions[tile]
-                if goal_r != r:
-                    not_in_row += 1
-                if goal_c != c:
-                    not_in_column += 1
-    return not_in_row + not_in_column
+    return sum(MISALIGNED[tile][cell] for cell, tile in enumerate(state.tiles()))
+
+H1.delta = lambda tile, source, target, tiles: MISPLACED[tile][target] - MISPLACED[tile][source]
+H3.delta = lambda tile, source, target, tiles: MANHATTAN[tile][target] - MANHATTAN[tile][source]
+H4.delta = lambda tile, source, target, tiles: MISALIGNED[tile][target] - MISALIGNED[tile][source]
+
+# Cell indices of each row (lines 0-3) and each column (lines 4-7)
+LINES = [[row * 4 + col for col in range(4)] for row in range(4)] + \
+        [[row * 4 + col for row in range(4)] for col in range(4)]
+
+def lineConflicts(tiles, line):
+    """
+    Number of tiles that must leave the given row or column so the tiles that
+    belong to it can pass each other: the tiles whose goal lies in this line,
+    minus the longest run of them already in goal order.
+    """
+    inRow = line < 4
+    order = []
+    for cell in LINES[line]:
+        tile = tiles[cell]
+        if tile != 0:
+            goal = GOAL_CELLS[tile]
+            if (goal // 4 if inRow else goal % 4 + 4) == line:
+                order.append(goal % 4 if inRow else goal // 4)
+    longest = [1] * len(order)
+    for i in range(len(order)):
+        for j in range(i):
+            if order[j] < order[i] and longest[j] + 1 > longest[i]:
+                longest[i] = longest[j] + 1
+    return len(order) - max(longest, default=0)
+
+def H6(state, problem=None):
+    """Manhattan distance plus two moves for every tile caught in a linear conflict."""
+    tiles = state.tiles()
+    distance = sum(MANHATTAN[tile][cell] for cell, tile in enumerate(tiles))
+    return distance + 2 * sum(lineConflicts(tiles, line) for line in range(8))
+
+def _linearConflictDelta(tile, source, target, tiles):
+    # A vertical move only changes the two rows involved, a horizontal one the two columns
+    if source // 4 != target // 4:
+        lines = (source // 4, target // 4)
+    else:
+        lines = (source % 4 + 4, target % 4 + 4)
+    after = tiles[:]
+    after[target] = tile
+    after[source] = 0
+    change = sum(lineConflicts(after, line) - lineConflicts(tiles, line) for line in lines)
+    return MANHATTAN[tile][target] - MANHATTAN[tile][source] + 2 * change
+
+H6.delta = _linearConflictDelta
+
+_patternDatabase = None
+
+def H5(state, problem=None):
+    """Additive 5-5-5 disjoint pattern database heuristic (see patterndb.py)."""
+    global _patternDatabase
+    if _patternDatabase is None:
+        # Built on first use (about a minute) and memory-mapped from disk afterwards
+        _patternDatabase = patterndb.PatternDatabase()
+    return _patternDatabase(state, problem)
+
+_walkingDistance = None
+
+def H7(state, problem=None):
+    """Walking distance heuristic: vertical plus horizontal walking distance (see walkingdistance.py)."""
+    global _walkingDistance
+    if _walkingDistance is None:
+        _walkingDistance = walkingdistance.WalkingDistance()
+    return _walkingDistance(state, problem)
 
 #end of task 2 
 
-def aStarSearch(problem, heuristic=nullHeuristic):
-    """Search the node that has the lowest combined cost and heuristic first."""
-    frontier = util.PriorityQueue()
+def aStarSearch(problem, heuristic=nullHeuristic, cache=None, weight=1, limits=None):
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+    With a solutioncache.SolutionCache, a board already solved with this
+    heuristic is answered from the cache and new solutions are stored in it.
+
+    weight > 1 runs weighted A*, ordering by f = g + weight * h: far fewer
+    expansions, and with an admissible, consistent heuristic the solution
+    costs at most weight times the optimum. Weighted runs bypass the cache.
+    """
+    stats = instrumentation.SearchStats('aStarSearch', limits)
     start = problem.getStartState()
-    frontier.push((start, [], 0), heuristic(start, problem))
+    if float(weight).is_integer():
+        weight = int(weight)  # Keeps integer heuristics on the bucket queue
+    if weight != 1:
+        cache = None
+    if cache is not None:
+        algorithm = cache.algorithmName(aStarSearch, heuristic)
+        cached = cache.get(start, algorithm)
+        if cached is not None:
+            # Counts and time are those of the search that found the solution
+            return stats.result(cached['Solution'], cached['Expanded Nodes'], 0, 0, cached['Max Fringe Size'],
+                                Time=cached['Time'], Cached=True)
+    heuristic = stats.timeHeuristic(heuristic)
+    # Let the problem carry h on its states when the heuristic supports it
+    incremental = hasattr(problem, 'setHeuristic') and problem.setHeuristic(heuristic)
+    nodes = util.NodeTable()
+    startH = start.h if incremental else heuristic(start, problem)
+    # Integer heuristics get O(1) buckets indexed by f; others (like H2) a binary heap.
+    # Both pop the lowest h among equal f, i.e. the node deepest into the last f layer.
+    if isinstance(startH, int) and isinstance(weight, int):
+        frontier = util.BucketPriorityQueue()
+    else:
+        frontier = util.IndexedPriorityQueue()
+    frontier.push(start, nodes.add(-1, None, 0, startH), weight * startH, startH)
     visited = set()
     expandedNodes = 0
+    generatedNodes = 0
+    duplicates = 0
     maxFringeSize = 0
-    depth = 0
-    start_time = time.time()
 
     while not frontier.isEmpty():
-        state, actions, cost = frontier.pop()
+        state, node, _ = frontier.popEntry()
 
         if problem.isGoalState(state):
-            return {
-                'Solved': True,
-                'Solution': actions,
-                'Depth': len(actions),
-                'Expanded Nodes': expandedNodes,
-                'Max Fringe Size': maxFringeSize,
-                'Time': time.time() - start_time
-            }
-
-        if state not in visited:
-            visited.add(state)
+            result = stats.result(nodes.path(node), expandedNodes, generatedNodes, duplicates, maxFringeSize)
+            if cache is not None:
+                cache.put(start, algorithm, result)
+            return result
+
+        visited.add(state)
+        expandedNodes += 1
+        if not expandedNodes & stats.mask:
+            if stats.checkpoint(expandedNodes, generatedNodes, len(frontier), len(visited)):
+                break
+        cost = nodes.g[node]
+
+        for nextState, action, nextCost in problem.getSuccessors(state):
+            generatedNodes += 1
+            if nextState in visited:
+                duplicates += 1
+                continue
+            h = nextState.h if incremental else heuristic(nextState, problem)
+            f = cost + nextCost + weight * h
+            # Decrease-key: only kept if this path to nextState is cheaper than the queued one
+            if f < frontier.priority(nextState):
+                frontier.update(nextState, nodes.add(node, action, cost + nextCost, h), f, h)
+            else:
+                duplicates += 1
+        maxFringeSize = max(maxFringeSize, len(frontier))
+
+    return stats.result(None, expandedNodes, generatedNodes, duplicates, maxFringeSize)
+
+def anytimeAStarSearch(problem, heuristic=nullHeuristic, weight=3.0, weightStep=0.5, limits=None):
+    """
+    Anytime Repairing A* (ARA*, Likhachev et al., 2003): weighted A* with a
+    weight that starts at `weight` and drops by weightStep after every
+    solution until it reaches 1. Each round reuses the previous one's search:
+    states whose cost improved after they were expanded are put back in the
+    open list instead of starting over. After every round, the solution's
+    suboptimality bound is min(weight, cost / lowest g + h still open). The
+    solution costs at most bound times the optimum with an admissible
+    heuristic, and is optimal once the bound is 1.
+
+    The search stops at bound 1 or at its util.SearchLimits and returns the
+    best solution so far, with 'Suboptimality Bound' and 'Solutions', the
+    (time, depth, bound) of every solution found on the way.
+    """
+    stats = instrumentation.SearchStats('anytimeAStarSearch', limits)
+    heuristic = stats.timeHeuristic(heuristic)
+    start = problem.getStartState()
+    incremental = hasattr(problem, 'setHeuristic') and problem.setHeuristic(heuristic)
+    nodes = util.NodeTable()
+    startH = start.h if incremental else heuristic(start, problem)
+    best = {start: nodes.add(-1, None, 0, startH)}  # State -> node of the cheapest path found to it
+    frontier = util.IndexedPriorityQueue()
+    frontier.push(start, best[start], weight * startH, startH)
+    closed = set()
+    inconsistent = set()  # Closed states reached again more cheaply in this round
+    goalNode, goalCost = (best[start], 0) if problem.isGoalState(start) else (-1, float('inf'))
+    bound = float('inf')
+    solutions = []
+    expandedNodes = 0
+    generatedNodes = 0
+    duplicates = 0
+    maxFringeSize = 0
+    start_time = stats.startTime
+
+    def improvePath():
+        # Weighted A* until no open state could lead to a cheaper solution;
+        # returns False if the limits stopped it first
+        nonlocal goalNode, goalCost, expandedNodes, generatedNodes, duplicates, maxFringeSize
+        while not frontier.isEmpty() and goalCost > frontier.topPriority():
+            state, node, _ = frontier.popEntry()
+            closed.add(state)
             expandedNodes += 1
-            depth = max(depth, len(actions))
-
-            for nextState, action, nextCost in problem.getSuccessors(state):
-                newActions = actions + [action]
-                frontier.push((nextState, newActions, cost + nextCost), cost + nextCost + heuristic(nextState, problem))
-            maxFringeSize = max(maxFringeSize, frontier.count)
-
-    return {
-        'Solved': False,
-        'Solution': None,
-        'Depth': 0,
-        'Expanded Nodes': expandedNodes,
-        'Max Fringe Size': maxFringeSize,
-        'Time': time.time() - start_time
-    }
+            cost = nodes.g[node]
+            for nextState, action, stepCost in problem.getSuccessors(state):
+                generatedNodes += 1
+                nextCost = cost + stepCost
+                known = best.get(nextState)
+                if known is not None and nodes.g[known] <= nextCost:
+                    duplicates += 1
+                    continue
+                h = nextState.h if incremental else heuristic(nextState, problem)
+                child = nodes.add(node, action, nextCost, h)
+                best[nextState] = child
+                if nextCost < goalCost and problem.isGoalState(nextState):
+                    goalNode, goalCost = child, nextCost
+                if nextState in closed:
+                    inconsistent.add(nextState)
+                else:
+                    frontier.update(nextState, child, nextCost + weight * h, h)
+            maxFringeSize = max(maxFringeSize, len(frontier))
+            # Checked only once the state's successors are all in, so the bound stays valid
+            if not expandedNodes & stats.mask:
+                if stats.checkpoint(expandedNodes, generatedNodes, len(frontier), len(closed)):
+                    return False
+        return True
+
+    while True:
+        finished = improvePath()
+        if goalNode >= 0:
+            lowest = min((nodes.g[best[state]] + nodes.h[best[state]]
+                          for state in [key for key, _ in frontier.items()] + list(inconsistent)),
+                         default=goalCost)
+            newBound = min(weight, goalCost / lowest) if lowest > 0 else 1.0
+            if not solutions or len(nodes.path(goalNode)) < solutions[-1][1] or newBound < bound:
+                solutions.append((time.time() - start_time, len(nodes.path(goalNode)), max(newBound, 1.0)))
+            bound = max(newBound, 1.0)
+        if not finished or bound <= 1 or weight <= 1 or goalNode < 0:
+            break
+        # Next round: lower the weight and reorder the open and inconsistent states by it
+        weight = max(1, weight - weightStep)
+        pending = [key for key, _ in frontier.items()] + list(inconsistent)
+        frontier = util.IndexedPriorityQueue()
+        for state in pending:
+            node = best[state]
+            frontier.push(state, node, nodes.g[node] + weight * nodes.h[node], nodes.h[node])
+        closed.clear()
+        inconsistent.clear()
+
+    return stats.result(nodes.path(goalNode) if goalNode >= 0 else None, expandedNodes, generatedNodes,
+                        duplicates, maxFringeSize, **{'Suboptimality Bound': bound, 'Solutions': solutions})
+
+class _SearchStopped(Exception):
+    # Unwinds idaStarSearch's recursion when its limits are reached
+    pass
+
+def idaStarSearch(problem, heuristic=nullHeuristic, table=None, limits=None):
+    """
+    Iterative deepening A*: a series of depth-first searches, each cut off
+    when f = g + h exceeds the current bound, which is then raised to the
+    smallest f that went over it. Only the current path is stored, so memory
+    is linear in the solution depth. If the problem provides inverseAction,
+    its getSuccessors is given the previous action too and must leave out
+    the move that would undo it, so that move is never even generated.
+
+    With a util.TranspositionTable, every state whose subtree was searched
+    without success is stored with its g and the smallest f that exceeded
+    the bound below it. A state reached again with no lower g is skipped when
+    that f, shifted by the extra cost, is still over the bound, which prunes
+    transpositions within an iteration and some subtrees across iterations.
+    The table's size caps the extra memory. States need a packed int `key`.
+    Transposition hits count as duplicates.
+    """
+    stats = instrumentation.SearchStats('idaStarSearch', limits)
+    heuristic = stats.timeHeuristic(heuristic)
+    start = problem.getStartState()
+    prunesInverse = hasattr(problem, 'inverseAction')
+    incremental = hasattr(problem, 'setHeuristic') and problem.setHeuristic(heuristic)
+    path = []
+    expandedNodes = 0
+    generatedNodes = 0
+    duplicates = 0
+    maxFringeSize = 0
+
+    def boundedSearch(state, cost, bound, lastAction):
+        # Returns True when a goal was reached (path holds the actions),
+        # otherwise the smallest f value that exceeded bound.
+        nonlocal expandedNodes, generatedNodes, duplicates, maxFringeSize
+        f = cost + (state.h if incremental else heuristic(state, problem))
+        if f > bound:
+            return f
+        if problem.isGoalState(state):
+            return True
+        if table is not None:
+            seen = table.get(state.key)
+            # A lower f is a valid bound for this path only if it came at no lower cost
+            if seen is not None and seen[0] <= cost and seen[1] + cost - seen[0] > bound:
+                duplicates += 1
+                return seen[1] + cost - seen[0]
+        expandedNodes += 1
+        if not expandedNodes & stats.mask:
+            if stats.checkpoint(expandedNodes, generatedNodes, len(path) + 1, len(table) if table is not None else 0):
+                raise _SearchStopped()
+        maxFringeSize = max(maxFringeSize, len(path) + 1)
+        nextBound = float('inf')
+        successors = problem.getSuccessors(state, lastAction) if prunesInverse else problem.getSuccessors(state)
+        for nextState, action, stepCost in successors:
+            generatedNodes += 1
+            path.append(action)
+            result = boundedSearch(nextState, cost + stepCost, bound, action)
+            if result is True:
+                return True
+            path.pop()
+            nextBound = min(nextBound, result)
+        if table is not None:
+            table.store(state.key, cost, nextBound)
+        return nextBound
+
+    bound = start.h if incremental else heuristic(start, problem)
+    while True:
+        try:
+            result = boundedSearch(start, 0, bound, None)
+        except _SearchStopped:
+            break
+        if result is True:
+            return stats.result(path, expandedNodes, generatedNodes, duplicates, maxFringeSize)
+        if result == float('inf'):
+            break
+        bound = result
+
+    return stats.result(None, expandedNodes, generatedNodes, duplicates, maxFringeSize)
+
+class _BoundedNode:
+    # A node of the tree kept by smaStarSearch
+    __slots__ = ('state', 'parent', 'action', 'g', 'f', 'depth', 'children', 'forgotten', 'stamp')
+
+    def __init__(self, state, parent, action, g, f, depth):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.g = g
+        self.f = f
+        self.depth = depth
+        self.children = []
+        self.forgotten = float('inf')  # Lowest f among pruned children
+        self.stamp = 0                 # Bumped whenever the node (re)enters the open leaves
+
+def smaStarSearch(problem, heuristic=nullHeuristic, maxNodes=100000, limits=None):
+    """
+    Memory-bounded A* in the style of SMA* (Russell, 1992): the search tree
+    never holds more than maxNodes nodes. f never drops below the parent's f
+    (pathmax), and an internal node's f is backed up to the lowest f of its
+    children. When the tree is over budget, the leaf with the highest f
+    (shallowest on ties) is pruned and its parent remembers the lowest f of
+    its pruned children. The search picks whatever has the lowest f (deepest
+    on ties): a leaf, which is then expanded with all its successors, or a
+    node whose pruned children are the best bet, which regenerates them.
+
+    It searches a tree, skipping only the move that undoes the previous one
+    (if the problem provides inverseAction; see idaStarSearch). Paths longer
+    than maxNodes - 1 moves cannot be held and are given up on. So with an
+    admissible heuristic the solution is optimal whenever an optimal path
+    fits in the budget, though a budget barely above the solution depth can
+    make it regenerate the same subtrees many times. The result also reports
+    'Pruned Nodes'.
+    """
+    stats = instrumentation.SearchStats('smaStarSearch', limits)
+    heuristic = stats.timeHeuristic(heuristic)
+    start = problem.getStartState()
+    prunesInverse = hasattr(problem, 'inverseAction')
+    incremental = hasattr(problem, 'setHeuristic') and problem.setHeuristic(heuristic)
+    root = _BoundedNode(start, None, None, 0, start.h if incremental else heuristic(start, problem), 0)
+    # Candidates are kept in two lazily cleaned heaps: everything that can be
+    # expanded best first, and leaves worst first. Changing a node's stamp
+    # invalidates all its entries. Stale entries keep pruned nodes alive, so
+    # the heaps are rebuilt from the live ones before they outgrow the budget.
+    best = []
+    worst = []
+    count = 0
+    leaves = 0
+
+    def push(node):
+        nonlocal count, leaves
+        count += 1
+        node.stamp += 1
+        if node.children:  # Pruned children to regenerate
+            heapq.heappush(best, (node.forgotten, -node.depth, -count, node.stamp, node))
+        else:
+            leaves += 1
+            heapq.heappush(best, (node.f, -node.depth, -count, node.stamp, node))
+            heapq.heappush(worst, (-node.f, node.depth, count, node.stamp, node))
+
+    def pop(heap):
+        nonlocal leaves
+        while True:
+            node, stamp = heap[0][4], heap[0][3]
+            heapq.heappop(heap)
+            if node.stamp == stamp:
+                node.stamp += 1
+                if not node.children:
+                    leaves -= 1
+                return node
+
+    def compact():
+        best[:] = [entry for entry in best if entry[4].stamp == entry[3]]
+        worst[:] = [entry for entry in worst if entry[4].stamp == entry[3]]
+        heapq.heapify(best)
+        heapq.heapify(worst)
+
+    push(root)
+    used = 1
+    expandedNodes = 0
+    generatedNodes = 0
+    prunedNodes = 0
+    maxFringeSize = 1
+
+    while best:
+        node = pop(best)
+        if node.children:
+            f = node.forgotten
+        else:
+            f = node.f
+            if problem.isGoalState(node.state):
+                actions = []
+                while node.parent is not None:
+                    actions.append(node.action)
+                    node = node.parent
+                actions.reverse()
+                return stats.result(actions, expandedNodes, generatedNodes, 0, maxFringeSize,
+                                    **{'Pruned Nodes': prunedNodes})
+        if f == float('inf'):
+            break
+
+        expandedNodes += 1
+        if not expandedNodes & stats.mask:
+            if stats.checkpoint(expandedNodes, generatedNodes, leaves, used - leaves):
+                break
+        kept = {child.action for child in node.children}
+        node.forgotten = float('inf')
+        if node.depth + 2 <= maxNodes:  # Room for the path down to a child
+            if prunesInverse:
+                successors = problem.getSuccessors(node.state, node.action)
+            else:
+                successors = problem.getSuccessors(node.state)
+            for nextState, action, stepCost in successors:
+                if action in kept:
+                    continue
+                g = node.g + stepCost
+                h = nextState.h if incremental else heuristic(nextState, problem)
+                child = _BoundedNode(nextState, node, action, g, max(f, g + h), node.depth + 1)
+                node.children.append(child)
+                push(child)
+                used += 1
+                generatedNodes += 1
+
+        if not node.children:
+            node.f = float('inf')
+            push(node)  # Goes to the back; it is pruned or ends the search
+        # Back up the lowest f of the children through the ancestors
+        ancestor = node if node.children else node.parent
+        while ancestor is not None:
+            backedUp = min(min(child.f for child in ancestor.children), ancestor.forgotten)
+            if backedUp == ancestor.f:
+                break
+            ancestor.f = backedUp
+            ancestor = ancestor.parent
+
+        while used > maxNodes:
+            leaf = pop(worst)
+            parent = leaf.parent
+            if parent is None:  # Only the root is left
+                push(leaf)
+                break
+            parent.children.remove(leaf)
+            parent.forgotten = min(parent.forgotten, leaf.f)
+            used -= 1
+            prunedNodes += 1
+            if not parent.children:
+                parent.f = parent.forgotten
+            push(parent)
+        if len(best) + len(worst) > 4 * used + 64:  # At most 2 live entries per node
+            compact()
+        maxFringeSize = max(maxFringeSize, leaves)
+
+    return stats.result(None, expandedNodes, generatedNodes, 0, maxFringeSize, **{'Pruned Nodes': prunedNodes})
+
+def manhattanTo(target):
+    """
+    Return a heuristic estimating the moves from a board to `target` (any
+    board, not just the goal) by Manhattan distance. Used as the backward
+    heuristic of bidirectionalAStarSearch, where the target is the start.
+    """
+    targetCells = [0] * 16
+    for cell, tile in enumerate(target.tiles()):
+        targetCells[tile] = cell
+    distance = manhattanTable(targetCells)
+
+    def heuristic(state, problem=None):
+        return sum(distance[tile][cell] for cell, tile in enumerate(state.tiles()))
+    return heuristic
+
+def _joinPaths(meet, forwardParents, backwardParents):
+    # forwardParents: state -> (parent, action from parent to state)
+    # backwardParents: state -> (next state towards the goal, action from state to it)
+    actions = []
+    state = meet
+    while forwardParents[state][0] is not None:
+        state, action = forwardParents[state]
+        actions.append(action)
+    actions.reverse()
+    state = meet
+    while backwardParents[state][0] is not None:
+        state, action = backwardParents[state]
+        actions.append(action)
+    return actions
+
+def bidirectionalBreadthFirstSearch(problem, limits=None):
+    """
+    Breadth-first search from the start and from the goal at the same time,
+    always expanding a whole layer of the smaller frontier, and stopping as
+    soon as a generated state has been reached from the other side. Each
+    side only goes about half the solution depth deep, so memory is about
+    2 * b^(d/2) instead of b^d. The problem must provide getGoalState and
+    inverseAction, and moves must have unit cost.
+    """
+    stats = instrumentation.SearchStats('bidirectionalBreadthFirstSearch', limits)
+    start = problem.getStartState()
+    goal = problem.getGoalState()
+    if hasattr(problem, 'setHeuristic'):
+        problem.setHeuristic(None)  # States reached from the goal carry no h
+    forwardParents = {start: (None, None)}
+    backwardParents = {goal: (None, None)}
+    forwardLayer = [start]
+    backwardLayer = [goal]
+    expanded_nodes = 0
+    generated_nodes = 0
+    duplicates = 0
+    max_fringe_size = 1
+    meet = start if start == goal else None
+
+    while meet is None and stats.stopped is None and forwardLayer and backwardLayer:
+        # Once no state has been reached from both sides, the first one that
+        # is, in either direction, lies on a shortest path
+        forward = len(forwardLayer) <= len(backwardLayer)
+        layer, parents, others = (forwardLayer, forwardParents, backwardParents) if forward \
+            else (backwardLayer, backwardParents, forwardParents)
+        nextLayer = []
+        for state in layer:
+            expanded_nodes += 1
+            if not expanded_nodes & stats.mask:
+                if stats.checkpoint(expanded_nodes, generated_nodes, len(forwardLayer) + len(backwardLayer),
+                                    len(forwardParents) + len(backwardParents)):
+                    break
+            for successor, action, _ in problem.getSuccessors(state):
+                generated_nodes += 1
+                if successor in parents:
+                    duplicates += 1
+                    continue
+                parents[successor] = (state, action) if forward else (state, problem.inverseAction(action))
+                if successor in others:
+                    meet = successor
+                    break
+                nextLayer.append(successor)
+            if meet is not None:
+                break
+        if forward:
+            forwardLayer = nextLayer
+        else:
+            backwardLayer = nextLayer
+        max_fringe_size = max(max_fringe_size, len(forwardLayer) + len(backwardLayer))
+
+    path = _joinPaths(meet, forwardParents, backwardParents) if meet is not None else None
+    return stats.result(path, expanded_nodes, generated_nodes, duplicates, max_fringe_size)
+
+def bidirectionalAStarSearch(problem, heuristic=nullHeuristic, backwardHeuristic=None, limits=None):
+    """
+    Front-to-end bidirectional A* in the style of MM (Holte et al., 2016).
+    Each direction orders its open list by pr(n) = max(g + h, 2 * g), the
+    forward side with heuristic (distance to the goal) and the backward side
+    with backwardHeuristic (distance from the start; defaults to
+    manhattanTo(start) for boards). Every time a state is reached from both
+    sides the cheapest meeting cost U is updated, and the search stops once U
+    is no larger than the smallest priority left in either open list, so the
+    path is optimal when both heuristics are admissible. The problem must
+    provide getGoalState and inverseAction.
+    """
+    stats = instrumentation.SearchStats('bidirectionalAStarSearch', limits)
+    start = problem.getStartState()
+    goal = problem.getGoalState()
+    if backwardHeuristic is None:
+        backwardHeuristic = manhattanTo(start) if hasattr(start, 'tiles') else nullHeuristic
+    heuristic = stats.timeHeuristic(heuristic)
+    backwardHeuristic = stats.timeHeuristic(backwardHeuristic)
+    if hasattr(problem, 'setHeuristic'):
+        problem.setHeuristic(None)  # States reached from the goal carry no h
+
+    sides = []
+    for root, side_heuristic in ((start, heuristic), (goal, backwardHeuristic)):
+        frontier = util.IndexedPriorityQueue()
+        h = side_heuristic(root, problem)
+        frontier.push(root, root, max(h, 0), h)
+        sides.append({'frontier': frontier, 'heuristic': side_heuristic, 'g': {root: 0},
+                      'parents': {root: (None, None)}})
+    forward, backward = sides
+
+    best = 0 if start == goal else float('inf')
+    meet = start if start == goal else None
+    expandedNodes = 0
+    generatedNodes = 0
+    duplicates = 0
+    maxFringeSize = 2
+
+    while not forward['frontier'].isEmpty() and not backward['frontier'].isEmpty():
+        forwardTop = forward['frontier'].topPriority()
+        backwardTop = backward['frontier'].topPriority()
+        if best <= min(forwardTop, backwardTop):
+            break
+        isForward = forwardTop <= backwardTop
+        side, other = (forward, backward) if isForward else (backward, forward)
+        state, _, _ = side['frontier'].popEntry()
+        expandedNodes += 1
+        if not expandedNodes & stats.mask:
+            if stats.checkpoint(expandedNodes, generatedNodes, len(forward['frontier']) + len(backward['frontier']),
+                                len(forward['g']) + len(backward['g'])):
+                break
+        cost = side['g'][state]
+
+        for nextState, action, stepCost in problem.getSuccessors(state):
+            generatedNodes += 1
+            nextCost = cost + stepCost
+            if side['g'].get(nextState, float('inf')) <= nextCost:
+                duplicates += 1
+                continue
+            side['g'][nextState] = nextCost
+            side['parents'][nextState] = (state, action) if isForward else (state, problem.inverseAction(action))
+            h = side['heuristic'](nextState, problem)
+            side['frontier'].update(nextState, nextState, max(nextCost + h, 2 * nextCost), h)
+            if nextState in other['g'] and nextCost + other['g'][nextState] < best:
+                best = nextCost + other['g'][nextState]
+                meet = nextState
+        maxFringeSize = max(maxFringeSize, len(forward['frontier']) + len(backward['frontier']))
+
+    actions = _joinPaths(meet, forward['parents'], backward['parents']) if meet is not None else None
+    return stats.result(actions, expandedNodes, generatedNodes, duplicates, maxFringeSize)
 
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 ucs = uniformCostSearch
 astar = aStarSearch
+arastar = anytimeAStarSearch
+idastar = idaStarSearch
+smastar = smaStarSearch
+bibfs = bidirectionalBreadthFirstSearch
+biastar = bidirectionalAStarSearch
@@ -0,0 +1,135 @@
+"""
+In solutioncache.py, we keep the solutions found by earlier runs in a small
+SQLite file so that solving the same board again with the same algorithm is a
+lookup instead of a search. Entries are keyed by the packed board (see
+fifteenpuzzle.packBoard) and an algorithm name such as 'aStarSearch/H6', and
+hold the solution length, the moves as a string of U/D/L/R and the stats of
+the search that found them. Once the file holds more than maxEntries
+solutions, the least recently used ones are evicted.
+
+The file lives next to the pattern databases by default. Only searches that
+found a solution are cached. Processes sharing the file wait up to timeout
+seconds for each other's writes; a write that still fails (the file stays
+locked, the disk is full) is logged and skipped, since losing a cache entry
+must never fail the search that found it.
+"""
+
+import logging
+import os
+import sqlite3
+import fifteenpuzzle
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdb', 'solutions.sqlite')
+DEFAULT_TIMEOUT = 30  # Seconds to wait for another process to finish writing
+
+MOVE_LETTERS = {'up': 'U', 'down': 'D', 'left': 'L', 'right': 'R'}
+LETTER_MOVES = {letter: move for move, letter in MOVE_LETTERS.items()}
+
+# Every get and put stamps the entry with the next use number, so processes
+# sharing the file agree on which entries were used least recently
+NEXT_USE = '(SELECT COALESCE(MAX(used), 0) + 1 FROM solutions)'
+USE = 'UPDATE solutions SET used = %s WHERE board = ? AND algorithm = ?' % NEXT_USE
+
+def boardKey(state):
+    """Packed board of a state or a flat list of tiles, as a signed 64-bit int for SQLite."""
+    board = fifteenpuzzle.packBoard(state if isinstance(state, list) else state.tiles())
+    return board - (1 << 64) if board >= 1 << 63 else board
+
+class SolutionCache:
+    """
+    On-disk cache of search results. get and put take the start state (or a
+    flat list of tiles) and an algorithm name, and the result dicts returned
+    by the searches in search.py.
+    """
+    def __init__(self, filename=DEFAULT_FILENAME, maxEntries=1000000, timeout=DEFAULT_TIMEOUT):
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        self.maxEntries = maxEntries
+        self.connection = sqlite3.connect(filename, timeout=timeout)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS solutions ('
+            ' board INTEGER, algorithm TEXT, depth INTEGER, moves TEXT,'
+            ' expanded INTEGER, fringe INTEGER, time REAL, used INTEGER,'
+            ' PRIMARY KEY (board, algorithm))')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)')
+        self.connection.commit()
+        self.count = len(self)
+
+    def get(self, state, algorithm):
+        """The cached result dict for state, or None on a miss."""
+        board = boardKey(state)
+        row = self.connection.execute(
+            'SELECT depth, moves, expanded, fringe, time FROM solutions WHERE board = ? AND algorithm = ?',
+            (board, algorithm)).fetchone()
+        if row is None:
+            return None
+        try:
+            self.connection.execute(USE, (board, algorithm))
+            self.connection.commit()
+        except sqlite3.OperationalError as error:
+            # Only the eviction order suffers
+            self.connection.rollback()
+            logger.warning("Could not mark a cached solution (%s) as used: %s", algorithm, error)
+        depth, moves, expanded, fringe, time = row
+        return {
+            'Solved': True,
+            'Solution': [LETTER_MOVES[letter] for letter in moves],
+            'Depth': depth,
+            'Expanded Nodes': expanded,
+            'Max Fringe Size': fringe,
+            'Time': time,
+            'Cached': True
+        }
+
+    def put(self, state, algorithm, result):
+        """Store a solved result, evicting the least recently used entries if the cache is full."""
+        if not result['Solved']:
+            return
+        try:
+            isNew = (state, algorithm) not in self
+            self.connection.execute(
+                'INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, %s)' % NEXT_USE,
+                (boardKey(state), algorithm, result['Depth'],
+                 ''.join(MOVE_LETTERS[move] for move in result['Solution']),
+                 result['Expanded Nodes'], result['Max Fringe Size'], result['Time']))
+            if isNew:
+                self.count += 1
+            if self.count > self.maxEntries:
+                # Another process may share the file, so count again before evicting
+                excess = len(self) - self.maxEntries
+                if excess > 0:
+                    self.connection.execute(
+                        'DELETE FROM solutions WHERE rowid IN (SELECT rowid FROM solutions ORDER BY used LIMIT ?)',
+                        (excess,))
+                self.count = len(self)
+            self.connection.commit()
+        except sqlite3.OperationalError as error:
+            self.connection.rollback()
+            logger.warning("Could not cache a solution (%s): %s", algorithm, error)
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+
+    def __contains__(self, key):
+        state, algorithm = key
+        return self.connection.execute('SELECT 1 FROM solutions WHERE board = ? AND algorithm = ?',
+                                       (boardKey(state), algorithm)).fetchone() is not None
+
+    def clear(self):
+        self.connection.execute('DELETE FROM solutions')
+        self.connection.commit()
+        self.count = 0
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def algorithmName(search, heuristic=None):
+        """Cache key of a search function run with a heuristic, e.g. 'aStarSearch/H6'."""
+        name = getattr(search, '__name__', str(search))
+        if heuristic is None:
+            return name
+        return '%s/%s' % (name, getattr(heuristic, '__name__', type(heuristic).__name__))
@@ -0,0 +1,303 @@
+"""
+In solverservice.py, we serve solve requests over a Unix socket (or TCP) so
+that frontends can share one pool of solver processes instead of running a
+CLI session per puzzle.
+
+The protocol is one JSON object per line in each direction. A request is
+
+    {"id": 7, "board": [1, 2, ..., 15, 0], "algorithm": "astar",
+     "heuristic": "H6", "timeout": 10}
+
+where algorithm is one of ALGORITHMS (default astar), heuristic one of
+HEURISTICS (default H6, ignored by the uninformed searches) and timeout the
+request's deadline in seconds (default and cap set on the server), counted
+from when the service reads the request, so time spent waiting for a free
+process counts too. A client
+may send any number of requests on one connection without waiting; each
+response
+    {"id": 7, "result": {"Status": "Solved", "Solution": ["up", ...], ...}, "shared": false}
+
+is written as soon as its search finishes, so responses come back in
+completion order. The result has the keys of the search's result dict
+except 'Samples' (see instrumentation.py); a search that ran out of time
+has 'Status' 'Timed Out' and the counts it reached (zero for a request
+whose deadline passed while it waited on a shared search). A bad request gets
+{"id": ..., "error": "..."}, and {"id": ..., "stats": true} returns the
+service's counters.
+
+Searches run in a process pool and stop themselves at their deadline (see
+util.SearchLimits). Requests for a board, algorithm and heuristic that are
+already being solved join that search instead of starting another one
+("shared": true); each still gets its own deadline, but a shared search
+keeps the deadline of the request that started it. Optimal A* results go
+through the solution cache like batch.py.
+
+Usage: python solverservice.py serve [--socket PATH | --port N] [--processes N]
+       python solverservice.py client scenarios.csv [--socket PATH | --port N]
+                              [--algorithm astar] [--heuristic H6] [--timeout S]
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+import generator
+import instrumentation
+import search
+import solutioncache
+import util
+from fifteenpuzzle import PackedFifteenPuzzleState, FifteenPuzzleSearchProblem, packBoard
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), 'fifteenpuzzle-solver.sock')
+DEFAULT_TIMEOUT = 30
+MAX_TIMEOUT = 600
+
+# Searches a request may name, and whether they take a heuristic
+ALGORITHMS = {
+    'astar': True,
+    'idastar': True,
+    'arastar': True,
+    'smastar': True,
+    'biastar': True,
+    'bibfs': False,
+    'bfs': False,
+    'ucs': False,
+    'dfs': False
+}
+HEURISTICS = ('H1', 'H2', 'H3', 'H4', 'H5', 'H6', 'H7')
+
+# Each worker opens the solution cache once, as in batch.py
+_cache = None
+
+def solve_request(board, algorithm, heuristic_name, deadline, cache_filename):
+    """Run one search in a worker process until deadline (a time.time()); returns its result dict without the samples."""
+    global _cache
+    problem = FifteenPuzzleSearchProblem(PackedFifteenPuzzleState(board))
+    limits = util.SearchLimits(deadline=deadline)
+    function = getattr(search, algorithm)
+    if algorithm == 'astar':
+        if cache_filename and _cache is None:
+            _cache = solutioncache.SolutionCache(cache_filename)
+        result = function(problem, getattr(search, heuristic_name), _cache if cache_filename else None, limits=limits)
+    elif ALGORITHMS[algorithm]:
+        result = function(problem, getattr(search, heuristic_name), limits=limits)
+    else:
+        result = function(problem, limits=limits)
+    result.pop('Samples', None)
+    return result
+
+def parse_request(request):
+    """(board, algorithm, heuristic, timeout) of a request; raises ValueError if it is invalid."""
+    board = request.get('board')
+    if not isinstance(board, list) or sorted(board) != list(range(16)):
+        raise ValueError("board must list the 16 tiles 0-15 in row-major order")
+    if not generator.is_solvable([board]):
+        raise ValueError("board is not solvable")
+    algorithm = request.get('algorithm', 'astar')
+    if algorithm not in ALGORITHMS:
+        raise ValueError("unknown algorithm %r, expected one of %s" % (algorithm, ', '.join(ALGORITHMS)))
+    heuristic = request.get('heuristic', 'H6') if ALGORITHMS[algorithm] else None
+    if ALGORITHMS[algorithm] and heuristic not in HEURISTICS:
+        raise ValueError("unknown heuristic %r, expected one of %s" % (heuristic, ', '.join(HEURISTICS)))
+    timeout = request.get('timeout', DEFAULT_TIMEOUT)
+    if not isinstance(timeout, (int, float)) or timeout <= 0:
+        raise ValueError("timeout must be a positive number of seconds")
+    return board, algorithm, heuristic, min(timeout, MAX_TIMEOUT)
+
+class SolverService:
+    """
+    The asyncio side of the service: reads requests from connections, hands
+    new searches to the process pool and writes each response when its
+    search is done.
+    """
+    def __init__(self, processes=None, cache_filename=solutioncache.DEFAULT_FILENAME):
+        self.pool = concurrent.futures.ProcessPoolExecutor(processes)
+        self.cache_filename = cache_filename
+        self.in_flight = {}  # (packed board, algorithm, heuristic) -> future of the running search
+        self.stats = {'Requests': 0, 'Searches': 0, 'Shared': 0, 'Solved': 0, 'Unsolved': 0, 'Errors': 0}
+
+    async def solve(self, board, algorithm, heuristic, timeout):
+        """Result dict for a request and whether it joined a search already running."""
+        stats = instrumentation.SearchStats(getattr(search, algorithm).__name__)
+        deadline = stats.startTime + timeout
+        key = (packBoard(board), algorithm, heuristic)
+        future = self.in_flight.get(key)
+        shared = future is not None
+        if shared:
+            self.stats['Shared'] += 1
+        else:
+            self.stats['Searches'] += 1
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.pool, solve_request, board, algorithm, heuristic, deadline,
+                                          self.cache_filename if algorithm == 'astar' else None)
+            self.in_flight[key] = future
+            future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        try:
+            # A search stops itself at its deadline, so this only fires for a
+            # request that joined a search with a later deadline than its own
+            # (or, a second late, for a search that is stuck)
+            remaining = deadline - time.time()
+            result = await asyncio.wait_for(asyncio.shield(future), remaining if shared else remaining + 1)
+        except asyncio.TimeoutError:
+            # Same keys as a search's result; the search ran elsewhere, so no counts
+            stats.stopped = 'Timed Out'
+            result = stats.result(None, 0, 0, 0, 0, **{'Peak RSS': None})
+            del result['Samples']
+        return result, shared
+
+    async def respond(self, request, writer):
+        self.stats['Requests'] += 1
+        request_id = request.get('id')
+        if request.get('stats'):
+            response = {'id': request_id, 'stats': dict(self.stats, **{'In Flight': len(self.in_flight)})}
+        else:
+            try:
+                result, shared = await self.solve(*parse_request(request))
+                self.stats['Solved' if result['Solved'] else 'Unsolved'] += 1
+                response = {'id': request_id, 'result': result, 'shared': shared}
+            except Exception as error:  # Bad requests and failed searches alike go back to the client
+                self.stats['Errors'] += 1
+                response = {'id': request_id, 'error': str(error) or type(error).__name__}
+        writer.write((json.dumps(response) + '\n').encode())
+        await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("a request must be a JSON object")
+                except ValueError as error:
+                    self.stats['Errors'] += 1
+                    writer.write((json.dumps({'id': None, 'error': str(error)}) + '\n').encode())
+                    continue
+                task = asyncio.ensure_future(self.respond(request, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path=None, host='127.0.0.1', port=None):
+        """Serve on a Unix socket, or on host:port when a port is given, until cancelled."""
+        if port is not None:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        else:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)  # Left over from an earlier run
+            server = await asyncio.start_unix_server(self.handle_connection, socket_path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+
+class SolverClient:
+    """
+    Client for a running service. solve sends one request and waits for its
+    result; several solve calls can be in flight on the one connection, and
+    solve_all yields results as they arrive.
+    """
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count()
+        self.pending = {}  # Request id -> future of its response
+        self.listener = asyncio.ensure_future(self._listen())
+
+    @classmethod
+    async def connect(cls, socket_path=DEFAULT_SOCKET, host='127.0.0.1', port=None):
+        if port is not None:
+            reader, writer = await asyncio.open_connection(host, port)
+        else:
+            reader, writer = await asyncio.open_unix_connection(socket_path)
+        return cls(reader, writer)
+
+    async def _listen(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.pending.pop(response.get('id'), None)
+            if future is not None and not future.done():
+                future.set_result(response)
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("the solver service closed the connection"))
+
+    async def request(self, **request):
+        """Send a request and wait for its response dict."""
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write((json.dumps(dict(request, id=request_id)) + '\n').encode())
+        await self.writer.drain()
+        return await future
+
+    async def solve(self, board, algorithm='astar', heuristic='H6', timeout=DEFAULT_TIMEOUT):
+        """Result dict of a board; raises Exception with the service's message on an error."""
+        response = await self.request(board=list(board), algorithm=algorithm, heuristic=heuristic, timeout=timeout)
+        if 'error' in response:
+            raise Exception(response['error'])
+        return response['result']
+
+    async def solve_all(self, boards, algorithm='astar', heuristic='H6', timeout=DEFAULT_TIMEOUT):
+        """Yield (board, result) for all boards, in the order the results arrive."""
+        async def solve(board):
+            return board, await self.solve(board, algorithm, heuristic, timeout)
+        for next_result in asyncio.as_completed([solve(board) for board in boards]):
+            yield await next_result
+
+    async def stats(self):
+        return (await self.request(stats=True))['stats']
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.listener.cancel()
+
+async def run_client(args):
+    from batch import read_scenarios
+    client = await SolverClient.connect(args.socket, args.host, args.port)
+    start_time = time.time()
+    try:
+        async for board, result in client.solve_all(read_scenarios(args.scenarios), args.algorithm,
+                                                   args.heuristic, args.timeout):
+            print(f"{' '.join(map(str, board))}: {result['Status']}, depth {result['Depth']}, "
+                  f"{result.get('Expanded Nodes', 0)} expanded, {result['Time']:.3f}s")
+        print(f"Done in {time.time() - start_time:.1f}s; service stats: {await client.stats()}")
+    finally:
+        await client.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve solve requests, or send some to a running service.")
+    parser.add_argument('command', choices=['serve', 'client'])
+    parser.add_argument('scenarios', nargs='?', default='scenarios.csv', help="boards for the client to send")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=None, help="use TCP on this port instead of the Unix socket")
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--algorithm', default='astar', choices=list(ALGORITHMS))
+    parser.add_argument('--heuristic', default='H6', choices=HEURISTICS)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_args()
+    try:
+        if args.command == 'serve':
+            print(f"Serving on {args.host}:{args.port}" if args.port is not None else f"Serving on {args.socket}")
+            asyncio.run(SolverService(args.processes).serve(args.socket, args.host, args.port))
+        else:
+            asyncio.run(run_client(args))
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,24 @@
+import random
+import pytest
+import search
+from fifteenpuzzle import FifteenPuzzleState, PackedFifteenPuzzleState, FifteenPuzzleSearchProblem, createRandomFifteenPuzzle
+
+HEURISTICS = [search.H1, search.H2, search.H3, search.H4, search.H5, search.H6, search.H7]
+GOAL = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0]
+
+@pytest.mark.parametrize('stateClass', [FifteenPuzzleState, PackedFifteenPuzzleState])
+@pytest.mark.parametrize('heuristic', HEURISTICS, ids=lambda heuristic: heuristic.__name__)
+def test_heuristic_is_zero_at_goal(heuristic, stateClass):
+    assert heuristic(stateClass(GOAL)) == 0
+
+@pytest.mark.parametrize('heuristic', [heuristic for heuristic in HEURISTICS if hasattr(heuristic, 'delta')],
+                         ids=lambda heuristic: heuristic.__name__)
+def test_incremental_value_matches_full_evaluation(heuristic):
+    random.seed(4)
+    state = createRandomFifteenPuzzle(60, packed=True)
+    problem = FifteenPuzzleSearchProblem(state, heuristic)
+    for _ in range(200):
+        successors = problem.getSuccessors(state)
+        for successor, _, _ in successors:
+            assert successor.h == heuristic(successor)
+        state = random.choice(successors)[0]
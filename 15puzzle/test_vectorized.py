@@ -0,0 +1,17 @@
+import random
+import pytest
+import search
+from fifteenpuzzle import createRandomFifteenPuzzle
+
+vectorized = pytest.importorskip('vectorized')
+
+PAIRS = [(vectorized.batchH1, search.H1), (vectorized.batchH2, search.H2), (vectorized.batchH3, search.H3),
+         (vectorized.batchH4, search.H4), (vectorized.batchH6, search.H6)]
+
+@pytest.mark.parametrize('batchHeuristic, heuristic', PAIRS, ids=lambda function: function.__name__)
+def test_batch_heuristic_matches_search(batchHeuristic, heuristic):
+    random.seed(12)
+    states = [createRandomFifteenPuzzle(moves, packed=True) for moves in (0, 1, 5, 20, 80, 80, 80)]
+    values = batchHeuristic(vectorized.boardsFromStates(states))
+    assert values[0] == 0
+    assert values.tolist() == pytest.approx([heuristic(state) for state in states])
@@ -29,6 +29,10 @@
 import sys
 import inspect
 import heapq, random
+import pickle
+import tempfile
+from array import array
+from collections import deque
 from io import StringIO
 
 class FixedRandom:
@@ -148,26 +152,107 @@ class Stack:
         "Returns true if the stack is empty"
         return len(self.list) == 0
 
+    def __len__(self):
+        return len(self.list)
+
 class Queue:
     "A container with a first-in-first-out (FIFO) queuing policy."
     def __init__(self):
-        self.list = []
+        self.list = deque()  # O(1) at both ends
 
     def push(self,item):
         "Enqueue the 'item' into the queue"
-        self.list.insert(0,item)
+        self.list.append(item)
 
     def pop(self):
         """
           Dequeue the earliest enqueued item still in the queue. This
           operation removes the item from the queue.
         """
-        return self.list.pop()
+        return self.list.popleft()
 
     def isEmpty(self):
         "Returns true if the queue is empty"
         return len(self.list) == 0
 
+    def __len__(self):
+        return len(self.list)
+
+class SpillQueue:
+    """
+      FIFO queue with the same interface as Queue that keeps at most
+      maxChunks chunks of chunkSize items in memory. Items are gathered in
+      chunks; when too many full chunks are waiting, the newest one (the
+      last to be needed) is pickled to a temporary file and read back when
+      the queue reaches it. Items must be picklable. The file only grows
+      until the queue is closed or garbage collected.
+    """
+    def __init__(self, chunkSize=65536, maxChunks=16):
+        self.chunkSize = chunkSize
+        self.maxChunks = maxChunks
+        self.head = deque()     # Chunk being drained
+        self.tail = []          # Chunk being filled
+        self.waiting = deque()  # Full chunks in between: lists, or (offset, size) on disk
+        self.inMemory = 0       # Number of lists in self.waiting
+        self.size = 0
+        self.file = None
+
+    def push(self, item):
+        "Enqueue the 'item' into the queue"
+        self.tail.append(item)
+        self.size += 1
+        if len(self.tail) >= self.chunkSize:
+            chunk = self.tail
+            self.tail = []
+            if self.inMemory + 2 >= self.maxChunks:
+                chunk = self._spill(chunk)
+            else:
+                self.inMemory += 1
+            self.waiting.append(chunk)
+
+    def pop(self):
+        "Dequeue the earliest enqueued item still in the queue"
+        if not self.head:
+            if self.waiting:
+                chunk = self.waiting.popleft()
+                if isinstance(chunk, list):
+                    self.inMemory -= 1
+                else:
+                    chunk = self._load(chunk)
+                self.head = deque(chunk)
+            else:
+                self.head = deque(self.tail)
+                self.tail = []
+        self.size -= 1
+        return self.head.popleft()
+
+    def isEmpty(self):
+        "Returns true if the queue is empty"
+        return self.size == 0
+
+    def __len__(self):
+        return self.size
+
+    def close(self):
+        "Delete the spill file"
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def _spill(self, chunk):
+        if self.file is None:
+            self.file = tempfile.TemporaryFile()
+        self.file.seek(0, 2)
+        offset = self.file.tell()
+        data = pickle.dumps(chunk, pickle.HIGHEST_PROTOCOL)
+        self.file.write(data)
+        return offset, len(data)
+
+    def _load(self, location):
+        offset, size = location
+        self.file.seek(offset)
+        return pickle.loads(self.file.read(size))
+
 class PriorityQueue:
     """
       Implements a priority queue data structure. Each inserted item
@@ -206,6 +291,317 @@ class PriorityQueue:
         else:
             self.push(item, priority)
 
+class IndexedPriorityQueue:
+    """
+      Priority queue whose items are identified by a hashable key (a search
+      state, say). A key -> heap position map lets update() find an item
+      in O(1) and lower its priority in O(log n), so the queue never holds
+      two entries for the same key. Equal priorities are ordered by the
+      optional tieBreak (lowest first) and then by insertion order, so keys
+      and items are never compared with each other.
+    """
+    def  __init__(self):
+        self.heap = []  # [(priority, tieBreak, count), key, item]
+        self.index = {}
+        self.count = 0
+
+    def push(self, key, item, priority, tieBreak=0):
+        entry = [(priority, tieBreak, self.count), key, item]
+        self.count += 1
+        self.heap.append(entry)
+        self.index[key] = len(self.heap) - 1
+        self._siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        "Remove and return the item with the lowest priority"
+        return self.popEntry()[1]
+
+    def popEntry(self):
+        "Remove the item with the lowest priority and return (key, item, priority)"
+        heap = self.heap
+        top = heap[0]
+        last = heap.pop()
+        del self.index[top[1]]
+        if heap:
+            heap[0] = last
+            self.index[last[1]] = 0
+            self._siftDown(0)
+        return top[1], top[2], top[0][0]
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def topPriority(self):
+        "Lowest priority in the queue"
+        return self.heap[0][0][0]
+
+    def items(self):
+        "List the (key, item) of every queued entry, in no particular order"
+        return [(entry[1], entry[2]) for entry in self.heap]
+
+    def priority(self, key):
+        "Priority of the queued key, or infinity if it is not queued"
+        position = self.index.get(key)
+        return self.heap[position][0][0] if position is not None else float('inf')
+
+    def update(self, key, item, priority, tieBreak=0):
+        # If key already in queue with higher priority, replace its item and priority.
+        # If key already in queue with equal or lower priority, do nothing.
+        # If key not in queue, do the same thing as self.push.
+        # Returns True if the queue changed.
+        position = self.index.get(key)
+        if position is None:
+            self.push(key, item, priority, tieBreak)
+            return True
+        entry = self.heap[position]
+        if entry[0][0] <= priority:
+            return False
+        entry[0] = (priority, tieBreak, entry[0][2])
+        entry[2] = item
+        self._siftUp(position)
+        return True
+
+    def _siftUp(self, position):
+        heap, index = self.heap, self.index
+        entry = heap[position]
+        while position > 0:
+            parentPosition = (position - 1) >> 1
+            parent = heap[parentPosition]
+            if parent[0] <= entry[0]:
+                break
+            heap[position] = parent
+            index[parent[1]] = position
+            position = parentPosition
+        heap[position] = entry
+        index[entry[1]] = position
+
+    def _siftDown(self, position):
+        heap, index = self.heap, self.index
+        size = len(heap)
+        entry = heap[position]
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            right = child + 1
+            if right < size and heap[right][0] < heap[child][0]:
+                child = right
+            if entry[0] <= heap[child][0]:
+                break
+            heap[position] = heap[child]
+            index[heap[position][1]] = position
+            position = child
+        heap[position] = entry
+        index[entry[1]] = position
+
+class BucketPriorityQueue:
+    """
+      Keyed priority queue for small non-negative integer priorities, such as
+      f = g + h in A* with an integer heuristic. Entries live in buckets
+      indexed by priority and, inside each, by tieBreak (h in A*), so push
+      is O(1) and pop takes the lowest priority and then the lowest tieBreak
+      after skipping empty buckets; nothing is ever compared.
+
+      It has the same push/update/popEntry/priority interface as
+      IndexedPriorityQueue, but a decrease-key leaves the old entry in its
+      bucket and only the current entry of each key is returned by pop (lazy
+      deletion with a key -> current entry dictionary).
+    """
+    def  __init__(self):
+        self.buckets = []  # buckets[priority][tieBreak] -> list of (key, item, priority)
+        self.sizes = []    # Number of entries, stale ones included, in buckets[priority]
+        self.entries = {}  # Current entry of every queued key
+        self.lowest = 0
+
+    def push(self, key, item, priority, tieBreak=0):
+        priority = int(priority)
+        tieBreak = int(tieBreak)
+        entry = (key, item, priority)
+        while len(self.buckets) <= priority:
+            self.buckets.append([])
+            self.sizes.append(0)
+        bucket = self.buckets[priority]
+        while len(bucket) <= tieBreak:
+            bucket.append([])
+        bucket[tieBreak].append(entry)
+        self.sizes[priority] += 1
+        self.entries[key] = entry
+        if priority < self.lowest:
+            self.lowest = priority
+
+    def pop(self):
+        "Remove and return the item with the lowest priority"
+        return self.popEntry()[1]
+
+    def popEntry(self):
+        "Remove the item with the lowest priority and return (key, item, priority)"
+        while True:
+            while self.sizes[self.lowest] == 0:
+                self.lowest += 1
+            for entries in self.buckets[self.lowest]:
+                if entries:
+                    break
+            entry = entries.pop()
+            self.sizes[self.lowest] -= 1
+            if self.entries.get(entry[0]) is entry:  # Skip entries replaced by update
+                del self.entries[entry[0]]
+                return entry
+
+    def topPriority(self):
+        "Lowest priority in the queue, dropping the stale entries in front of it"
+        while self.entries:
+            while self.sizes[self.lowest] == 0:
+                self.lowest += 1
+            for entries in self.buckets[self.lowest]:
+                while entries and self.entries.get(entries[-1][0]) is not entries[-1]:
+                    entries.pop()
+                    self.sizes[self.lowest] -= 1
+                if entries:
+                    return self.lowest
+        return float('inf')
+
+    def isEmpty(self):
+        return len(self.entries) == 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def priority(self, key):
+        "Priority of the queued key, or infinity if it is not queued"
+        entry = self.entries.get(key)
+        return entry[2] if entry is not None else float('inf')
+
+    def update(self, key, item, priority, tieBreak=0):
+        # Same contract as IndexedPriorityQueue.update
+        if self.priority(key) <= priority:
+            return False
+        self.push(key, item, priority, tieBreak)
+        return True
+
+class NodeTable:
+    """
+      Search tree stored as parallel flat arrays: node i has the index of its
+      parent, the action that led to it, its path cost g and its heuristic
+      value h. Frontier entries only need to carry a node index, and the
+      list of actions is rebuilt by following parent pointers once, when a
+      goal is reached, instead of being copied on every push.
+    """
+    def __init__(self):
+        self.parent = array('l')
+        self.action = []
+        self.g = array('d')
+        self.h = array('d')
+
+    def add(self, parent, action, g=0, h=0):
+        "Store a node (parent -1 for the root) and return its index"
+        self.parent.append(parent)
+        self.action.append(action)
+        self.g.append(g)
+        self.h.append(h)
+        return len(self.action) - 1
+
+    def path(self, node):
+        "Return the actions leading from the root to node"
+        actions = []
+        while self.parent[node] >= 0:
+            actions.append(self.action[node])
+            node = self.parent[node]
+        actions.reverse()
+        return actions
+
+    def __len__(self):
+        return len(self.action)
+
+class TranspositionTable:
+    """
+      Fixed-size table of what a search learned about states it has seen,
+      keyed by non-negative int keys below 2**64 - 1 (packed boards). Each
+      entry holds the lowest path cost g the state was reached with and a
+      lower bound on the cost of solutions through it (the search decides
+      what the bound means). The slots are parallel arrays allocated once,
+      24 bytes each, so memory never grows past size slots.
+
+      A key may sit in any of the `probes` slots after its hash (open
+      addressing with linear probing). When all of them hold other keys, the
+      entry with the largest g is replaced: deep states head the smallest
+      subtrees and are the cheapest to search again.
+    """
+    def __init__(self, size=1 << 20, probes=4):
+        bits = max(size, probes).bit_length() - 1  # Round down to a power of two
+        self.shift = 64 - bits
+        self.mask = (1 << bits) - 1
+        self.probes = probes
+        self.keys = array('Q', bytes(8 << bits))  # key + 1, so 0 marks an empty slot
+        self.g = array('d', bytes(8 << bits))
+        self.bound = array('d', bytes(8 << bits))
+        self.used = 0
+        self.replaced = 0
+
+    def _slot(self, key):
+        # Fibonacci hashing: the top bits of key * 2**64 / golden ratio
+        return ((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> self.shift
+
+    def get(self, key):
+        "Return (g, bound) stored for key, or None"
+        stored = key + 1
+        slot = self._slot(key)
+        for _ in range(self.probes):
+            if self.keys[slot] == stored:
+                return self.g[slot], self.bound[slot]
+            if self.keys[slot] == 0:
+                return None
+            slot = (slot + 1) & self.mask
+        return None
+
+    def store(self, key, g, bound):
+        """
+          Record that key was reached with cost g and has the given bound. An
+          existing entry is only overwritten by a lower g, or by a higher
+          bound at the same g.
+        """
+        stored = key + 1
+        slot = self._slot(key)
+        victim = -1
+        for _ in range(self.probes):
+            current = self.keys[slot]
+            if current == stored:
+                if g < self.g[slot] or (g == self.g[slot] and bound > self.bound[slot]):
+                    self.g[slot] = g
+                    self.bound[slot] = bound
+                return
+            if current == 0:
+                self.used += 1
+                victim = slot
+                break
+            if victim < 0 or self.g[slot] > self.g[victim]:
+                victim = slot
+            slot = (slot + 1) & self.mask
+        else:
+            self.replaced += 1
+        self.keys[victim] = stored
+        self.g[victim] = g
+        self.bound[victim] = bound
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return self.used
+
+    def clear(self):
+        self.keys = array('Q', bytes(8 * len(self.keys)))
+        self.used = 0
+        self.replaced = 0
+
 class PriorityQueueWithFunction(PriorityQueue):
     """
     Implements a priority queue with the same push/pop signature of the
@@ -643,6 +1039,38 @@ class TimeoutFunction:
         return result
 
 
+class SearchLimits:
+    """
+    When a search should give up, checked by the search itself every
+    checkEvery expansions (a power of two), so unlike TimeoutFunction it needs
+    no signals, nests, and keeps the statistics gathered so far. Any of:
+
+    timeLimit: seconds from now; deadline: an absolute time.time()
+    maxExpansions: expansions, exceeded by less than checkEvery
+    cancel: any object with is_set(), such as a threading.Event or a
+            multiprocessing.Event; the search stops once it is set
+
+    exceeded(expandedNodes) returns why the search must stop, or None.
+    """
+    def __init__(self, timeLimit=None, maxExpansions=None, cancel=None, deadline=None, checkEvery=256):
+        if timeLimit is not None:
+            end = time.time() + timeLimit
+            deadline = end if deadline is None else min(deadline, end)
+        self.deadline = deadline
+        self.maxExpansions = maxExpansions
+        self.cancel = cancel
+        self.checkEvery = checkEvery
+
+    def exceeded(self, expandedNodes):
+        if self.cancel is not None and self.cancel.is_set():
+            return 'Cancelled'
+        if self.deadline is not None and time.time() >= self.deadline:
+            return 'Timed Out'
+        if self.maxExpansions is not None and expandedNodes >= self.maxExpansions:
+            return 'Node Budget'
+        return None
+
+
 
 _ORIGINAL_STDOUT = None
 _ORIGINAL_STDERR = None
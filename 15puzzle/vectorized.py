@@ -0,0 +1,138 @@
+"""
+In vectorized.py, we evaluate heuristics for many boards in one NumPy call
+and use that in an A* variant that expands nodes in batches. Boards are an
+(N, 16) uint8 array, one row per board in row-major order with 0 for the
+blank, and each batch heuristic returns the N values. They give the same
+values as the matching functions in search.py, read from [tile][cell]
+lookup tables built once at import.
+
+This module needs NumPy; the rest of the project does not.
+"""
+
+import time
+import numpy as np
+import instrumentation
+import search
+import util
+
+CELLS = np.arange(16)
+SHIFTS = np.arange(0, 64, 4, dtype=np.uint64)
+
+MISPLACED = np.array(search.MISPLACED, dtype=np.int32)
+MANHATTAN = np.array(search.MANHATTAN, dtype=np.int32)
+MISALIGNED = np.array(search.MISALIGNED, dtype=np.int32)
+EUCLIDEAN = np.array(search.EUCLIDEAN)
+
+# Linear conflicts: each tile of a row/column gets a key, its goal position
+# inside that line if it belongs there and 4 otherwise. The four keys of a
+# line, read as a base-5 number, index a table of conflict counts.
+LINE_CELLS = np.array(search.LINES)
+LINE_KEYS = np.array([[4 if tile == 0 else
+                       (search.GOAL_CELLS[tile] % 4 if search.GOAL_CELLS[tile] // 4 == line else 4) if line < 4 else
+                       (search.GOAL_CELLS[tile] // 4 if search.GOAL_CELLS[tile] % 4 == line - 4 else 4)
+                       for tile in range(16)] for line in range(8)])
+LINE_POWERS = np.array([1, 5, 25, 125])
+
+def _conflictTable():
+    table = np.zeros(5 ** 4, dtype=np.int32)
+    for code in range(5 ** 4):
+        order = [key for key in ((code // 5 ** i) % 5 for i in range(4)) if key < 4]
+        longest = [1] * len(order)
+        for i in range(len(order)):
+            for j in range(i):
+                if order[j] < order[i] and longest[j] + 1 > longest[i]:
+                    longest[i] = longest[j] + 1
+        table[code] = len(order) - max(longest, default=0)
+    return table
+
+LINE_CONFLICTS = _conflictTable()
+
+def boardsFromStates(states):
+    """Stack puzzle states into an (N, 16) uint8 array."""
+    if states and hasattr(states[0], 'board'):
+        keys = np.fromiter((state.board for state in states), dtype=np.uint64, count=len(states))
+        return ((keys[:, None] >> SHIFTS) & np.uint64(0xF)).astype(np.uint8)
+    return np.array([state.tiles() for state in states], dtype=np.uint8).reshape(-1, 16)
+
+def batchH1(boards):
+    """Misplaced tiles for every board (search.H1)."""
+    return MISPLACED[boards, CELLS].sum(axis=1)
+
+def batchH2(boards):
+    """Euclidean distance for every board (search.H2)."""
+    return EUCLIDEAN[boards, CELLS].sum(axis=1)
+
+def batchH3(boards):
+    """Manhattan distance for every board (search.H3)."""
+    return MANHATTAN[boards, CELLS].sum(axis=1)
+
+def batchH4(boards):
+    """Tiles out of their goal row and/or column for every board (search.H4)."""
+    return MISALIGNED[boards, CELLS].sum(axis=1)
+
+def batchH6(boards):
+    """Manhattan distance plus linear conflicts for every board (search.H6)."""
+    distance = MANHATTAN[boards, CELLS].sum(axis=1)
+    keys = LINE_KEYS[np.arange(8)[None, :, None], boards[:, LINE_CELLS]]  # (N, 8, 4)
+    conflicts = LINE_CONFLICTS[(keys * LINE_POWERS).sum(axis=2)].sum(axis=1)
+    return distance + 2 * conflicts
+
+def batchAStarSearch(problem, batchHeuristic=batchH6, batchSize=64, limits=None):
+    """
+    A* that pops up to batchSize nodes at a time, all with the current lowest
+    f, generates their successors together and scores them with one call to
+    batchHeuristic. Restricting a batch to a single f value keeps the first
+    goal popped optimal with a consistent heuristic. Returns the same dict as
+    search.aStarSearch and stops at the same util.SearchLimits.
+    """
+    stats = instrumentation.SearchStats('batchAStarSearch', limits)
+    start = problem.getStartState()
+    if hasattr(problem, 'setHeuristic'):
+        problem.setHeuristic(None)  # h comes from the batch heuristic instead
+    frontier = util.IndexedPriorityQueue()
+    nodes = util.NodeTable()
+    startH = batchHeuristic(boardsFromStates([start]))[0].item()
+    frontier.push(start, nodes.add(-1, None, 0, startH), startH, startH)
+    visited = set()
+    expandedNodes = 0
+    generatedNodes = 0
+    duplicates = 0
+    maxFringeSize = 0
+
+    while not frontier.isEmpty():
+        f = frontier.topPriority()
+        batch = []
+        while not frontier.isEmpty() and frontier.topPriority() == f and len(batch) < batchSize:
+            state, node, _ = frontier.popEntry()
+            if problem.isGoalState(state):
+                return stats.result(nodes.path(node), expandedNodes, generatedNodes, duplicates, maxFringeSize)
+            visited.add(state)
+            batch.append((state, node))
+
+        children = []
+        for state, node in batch:
+            expandedNodes += 1
+            if not expandedNodes & stats.mask:
+                if stats.checkpoint(expandedNodes, generatedNodes, len(frontier), len(visited)):
+                    break
+            cost = nodes.g[node]
+            for nextState, action, nextCost in problem.getSuccessors(state):
+                generatedNodes += 1
+                if nextState not in visited:
+                    children.append((nextState, node, action, cost + nextCost))
+                else:
+                    duplicates += 1
+        if stats.stopped is not None:
+            break
+        if children:
+            evaluationStart = time.perf_counter()
+            values = batchHeuristic(boardsFromStates([child[0] for child in children])).tolist()
+            stats.addHeuristicCalls(len(children), time.perf_counter() - evaluationStart)
+            for (nextState, node, action, cost), h in zip(children, values):
+                if nextState not in visited and cost + h < frontier.priority(nextState):
+                    frontier.update(nextState, nodes.add(node, action, cost, h), cost + h, h)
+                else:
+                    duplicates += 1
+        maxFringeSize = max(maxFringeSize, len(frontier))
+
+    return stats.result(None, expandedNodes, generatedNodes, duplicates, maxFringeSize)
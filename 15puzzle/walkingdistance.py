@@ -0,0 +1,98 @@
+"""
+In walkingdistance.py, we build the table behind the walking distance
+heuristic (H7 in search.py). Looking only at rows, a board is summarised by a
+4x4 matrix counting how many tiles of each goal row sit in each row, plus the
+row of the blank. Every vertical move swaps the blank with one tile of an
+adjacent row, so the fewest moves that turn a matrix into the goal matrix is
+a lower bound on the vertical moves still needed. By symmetry of the goal the
+same table gives the horizontal bound from the column matrix, and the sum of
+the two is admissible.
+
+The table (about 25,000 matrices) is built by a breadth-first search from the
+goal matrix the first time it is needed and cached next to the pattern
+databases.
+"""
+
+import os
+from array import array
+
+DEFAULT_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdb', 'walking_distance.bin')
+
+# Goal row and goal column of every tile; the blank (index 0) is not counted
+GOAL_ROWS = [0] + [(tile - 1) // 4 for tile in range(1, 16)]
+GOAL_COLUMNS = [0] + [(tile - 1) % 4 for tile in range(1, 16)]
+
+def matrixKey(counts):
+    """Pack a 4x4 count matrix (list of 16, row-major) into an int, 3 bits per count."""
+    key = 0
+    for index, count in enumerate(counts):
+        key |= count << (3 * index)
+    return key
+
+def buildTable():
+    """Breadth-first search from the goal matrix; returns {matrix key: distance}."""
+    goal = [0] * 16
+    for line in range(4):
+        goal[line * 4 + line] = 4 if line < 3 else 3
+    goalKey = matrixKey(goal)
+    table = {goalKey: 0}
+    frontier = [(goalKey, 3)]
+    distance = 0
+    while frontier:
+        distance += 1
+        nextFrontier = []
+        for key, blank in frontier:
+            for source in (blank - 1, blank + 1):
+                if not 0 <= source < 4:
+                    continue
+                for goalLine in range(4):
+                    sourceShift = 3 * (source * 4 + goalLine)
+                    if (key >> sourceShift) & 7:
+                        # A tile of goalLine moves from the source line into the blank's line
+                        nextKey = key - (1 << sourceShift) + (1 << (3 * (blank * 4 + goalLine)))
+                        if nextKey not in table:
+                            table[nextKey] = distance
+                            nextFrontier.append((nextKey, source))
+        frontier = nextFrontier
+    return table
+
+def loadTable(filename=DEFAULT_FILENAME):
+    """Load the cached table, building and saving it first if it is missing."""
+    keys = array('Q')
+    distances = array('B')
+    if os.path.exists(filename):
+        with open(filename, 'rb') as f:
+            count = array('Q')
+            count.fromfile(f, 1)
+            keys.fromfile(f, count[0])
+            distances.fromfile(f, count[0])
+        return dict(zip(keys, distances))
+
+    table = buildTable()
+    keys.extend(table.keys())
+    distances.extend(table.values())
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    temporary = '%s.%d.tmp' % (filename, os.getpid())
+    with open(temporary, 'wb') as f:
+        array('Q', [len(keys)]).tofile(f)
+        keys.tofile(f)
+        distances.tofile(f)
+    os.replace(temporary, filename)
+    return table
+
+class WalkingDistance:
+    """
+    Walking distance heuristic, called like the functions in search.py:
+    heuristic(state, problem).
+    """
+    def __init__(self, filename=DEFAULT_FILENAME):
+        self.table = loadTable(filename)
+
+    def __call__(self, state, problem=None):
+        rows = 0
+        columns = 0
+        for cell, tile in enumerate(state.tiles()):
+            if tile != 0:
+                rows += 1 << (3 * ((cell // 4) * 4 + GOAL_ROWS[tile]))
+                columns += 1 << (3 * ((cell % 4) * 4 + GOAL_COLUMNS[tile]))
+        return self.table[rows] + self.table[columns]